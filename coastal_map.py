@@ -2,20 +2,24 @@ import streamlit as st
 import pydeck as pdk
 import pandas as pd
 
-# Handle Streamlit version compatibility for fragments
-if hasattr(st, "fragment"):
-    fragment = st.fragment
-elif hasattr(st, "experimental_fragment"):
-    fragment = st.experimental_fragment
-else:
-    def fragment(func):
-        return func
+from gauge_store import GaugeSeries
+from streamlit_compat import fragment
 
 # ============================================================
 # DATA TRANSFORMATION & CACHING
 # ============================================================
 
-@st.cache_data(show_spinner=False)
+# The dashboard's shared CoastalSnapshot carries a unique token, so hash on
+# that instead of walking every entry. Not `version`: it restarts at 1 when
+# the refresher is recreated. (String key: importing dashboard_app here would
+# be circular.)
+@st.cache_data(
+    show_spinner=False,
+    hash_funcs={
+        GaugeSeries: GaugeSeries.fingerprint,
+        "dashboard_app.CoastalSnapshot": lambda snapshot: snapshot.token,
+    },
+)
 def _get_master_dataframe(coastal_data):
     """
     Process raw coastal_data dictionary into a Pandas DataFrame.
@@ -127,6 +131,11 @@ def _get_master_dataframe(coastal_data):
             elif "post" in sl: storm_score = 0.3
             else: storm_score = 0.4
 
+            # Incoming rain from the zone's storm stats lifts the weight too
+            storm_stats = e.get("storm_stats")
+            if storm_stats is not None:
+                storm_score = max(storm_score, storm_stats.intensity)
+
             cond = cond_text.lower()
             if cond == "in shape": cond_score = 1.0
             elif cond == "low": cond_score = 0.7
@@ -147,7 +156,7 @@ def _get_master_dataframe(coastal_data):
                 f"<b>Status:</b> {cond_text}<br/>"
                 f"<b>Flow/Stage:</b> {flow_str}<br/>"
                 f"<b>Trend:</b> {arrow} {pct_str} • {trend_text}<br/>"
-                f"<b>Storm:</b> {storm_emoji} {storm_label}<br/>"
+                f"<b>Storm:</b> {storm_emoji} {storm_label} • {e.get('storm_eta', 'Storm ETA —')}<br/>"
                 f"<b>Window:</b> {window_status}<br/>"
                 f"<b>Confidence:</b> {confidence_level}<br/>"
                 f"<b>Updated:</b> {time_str}<br/>"
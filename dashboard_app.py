@@ -1,7 +1,19 @@
 import streamlit as st
-import requests
 import datetime as dt
 import numpy as np
+import threading
+import time
+import uuid
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+
+from gauge_store import GaugeSeries, get_gauge_series, get_gauge_series_many
+from http_client import http_get
+from nws_client import get_precip_grid
+from streamlit_compat import fragment
 
 # NEW: Import map renderer with error handling for standalone runs
 try:
@@ -14,7 +26,8 @@ except ImportError:
 # COASTAL DASHBOARD — CHUNK 1: REGION SPECS
 # ============================================================
 
-def load_coastal_region_specs():
+def coastal_region_spec_literals():
+    """The hand-maintained catalog, as plain dicts (see COASTAL_SPECS)."""
     # 1. REGION SPECS — NORTHERN CALIFORNIA
     COASTAL_NORCAL = [
         {
@@ -963,52 +976,233 @@ def load_coastal_region_specs():
     return COASTAL_RIVER_SPECS
 
 # ============================================================
-# COASTAL DASHBOARD — CHUNK 2: UTILITIES + HYDROLOGY LOGIC
+# RIVER SPEC REGISTRY
 # ============================================================
+# The catalog above is turned into frozen specs once, at import: target
+# ranges are parsed to numbers, basin types become an enum, and the registry
+# indexes rivers by region, NOAA zone, basin type and gauge site id.
+# Specs still answer the old dict-style reads (spec.get("T"), g["ID"]) so
+# UI and map code written against the dicts keeps working.
+
+class CoastalBasinType(str, Enum):
+    FLASHY = "flashy"
+    MIXED = "mixed"
+    SEDIMENTARY = "sedimentary"
+    GLACIAL = "glacial"
+    UNKNOWN = ""
+
+    @classmethod
+    def parse(cls, text):
+        try:
+            return cls((text or "").lower())
+        except ValueError:
+            return cls.UNKNOWN
+
+    @property
+    def slow_clearing(self):
+        return self in (CoastalBasinType.SEDIMENTARY, CoastalBasinType.GLACIAL)
+
+class _CoastalSpecMapping(Mapping):
+    """Read-only dict-style access to a frozen spec via its legacy keys."""
+
+    _KEYS = {}
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        value = getattr(self, self._KEYS[key])
+        if value is None:
+            raise KeyError(key)
+        return value.value if isinstance(value, Enum) else value
+
+    def __iter__(self):
+        return (k for k, attr in self._KEYS.items() if getattr(self, attr) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+@dataclass(frozen=True, eq=True)
+class CoastalGauge(_CoastalSpecMapping):
+    site_id: str
+    param: str
+    role: str = ""
+    description: str = ""
+
+    _KEYS = {"ID": "site_id", "P": "param", "Role": "role", "Description": "description"}
+
+@dataclass(frozen=True, eq=True)
+class CoastalRiverSpec(_CoastalSpecMapping):
+    name: str
+    region: str
+    gauges: tuple
+    target: str            # as written, e.g. "1500-7500 cfs"
+    lo: float = None       # parsed target range (None if unparseable)
+    hi: float = None
+    unit: str = "cfs"
+    low: float = None      # legal/physical low-water limit
+    notes: str = ""
+    basin_type: CoastalBasinType = CoastalBasinType.UNKNOWN
+    noaa_zone: str = None
+
+    _KEYS = {
+        "Name": "name",
+        "Gauges": "gauges",
+        "T": "target",
+        "Low": "low",
+        "N": "notes",
+        "Type": "basin_type",
+        "NOAA_zone": "noaa_zone",
+    }
 
-@st.cache_data(ttl=600)
-def coastal_fetch_usgs_cached(site_id, param):
-    """Fetch 72h USGS data for a site."""
+    @property
+    def has_range(self):
+        return self.lo is not None and self.hi is not None
+
+    @property
+    def mid(self):
+        return (self.lo + self.hi) / 2 if self.has_range else None
+
+def coastal_parse_target(t_text):
+    """"1500-7500 cfs" -> (1500.0, 7500.0, "cfs"); (None, None, unit) if unparseable."""
+    t_text = (t_text or "").lower()
+    unit = "ft" if "ft" in t_text else "cfs"
     try:
-        url = (
-            "https://waterservices.usgs.gov/nwis/iv/"
-            f"?format=json&sites={site_id}&parameterCd={param}&period=P3D"
-        )
-        # Added User-Agent to prevent 403 Forbidden
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+        clean = t_text.replace("cfs", "").replace("ft", "").strip()
+        lo, hi = [float(x) for x in clean.split("-")]
+        return lo, hi, unit
+    except Exception:
+        return None, None, unit
+
+def coastal_make_spec(region_name, raw):
+    lo, hi, unit = coastal_parse_target(raw.get("T", ""))
+    return CoastalRiverSpec(
+        name=raw["Name"],
+        region=region_name,
+        gauges=tuple(
+            CoastalGauge(
+                site_id=g["ID"],
+                param=g["P"],
+                role=g.get("Role", ""),
+                description=g.get("Description", ""),
+            )
+            for g in raw.get("Gauges", [])
+        ),
+        target=raw.get("T", ""),
+        lo=lo,
+        hi=hi,
+        unit=unit,
+        low=raw.get("Low"),
+        notes=raw.get("N", ""),
+        basin_type=CoastalBasinType.parse(raw.get("Type")),
+        noaa_zone=raw.get("NOAA_zone"),
+    )
+
+class CoastalSpecRegistry:
+    """Every river spec, built once, with O(1) lookups. Read-only."""
+
+    def __init__(self, literals):
+        self._by_region = {
+            region_name: tuple(coastal_make_spec(region_name, raw) for raw in rivers)
+            for region_name, rivers in literals.items()
         }
-        r = requests.get(url, headers=headers, timeout=10)
-        
-        if r.status_code != 200:
-            return {"value": []}
-        
-        data = r.json()
+        self._all = tuple(spec for specs in self._by_region.values() for spec in specs)
+        self._by_name = {spec.name: spec for spec in self._all}
+        self._zones = tuple(dict.fromkeys(spec.noaa_zone for spec in self._all if spec.noaa_zone))
+        self._by_site = {}
+        for spec in self._all:
+            for g in spec.gauges:
+                self._by_site.setdefault(g.site_id, []).append(spec)
+        for key in self._by_site:
+            self._by_site[key] = tuple(self._by_site[key])
 
-        ts_list = data.get("value", {}).get("timeSeries", [])
-        if not ts_list:
-            return {"value": []}
+    def __iter__(self):
+        return iter(self._all)
 
-        values_blocks = ts_list[0].get("values", [])
-        if not values_blocks:
-            return {"value": []}
+    def __len__(self):
+        return len(self._all)
 
-        vals = values_blocks[0].get("value", [])
-        if not vals:
-            return {"value": []}
+    def regions(self):
+        """{region: (specs...)} in catalog order (a fresh dict each call)."""
+        return dict(self._by_region)
 
-        out = []
-        for v in vals:
-            dt_str = v.get("dateTime")
-            val_str = v.get("value")
-            if dt_str is None or val_str is None:
-                continue
-            out.append({"dateTime": dt_str, "value": val_str})
+    def region(self, region_name):
+        return self._by_region.get(region_name, ())
 
-        return {"value": out}
+    def get(self, name):
+        return self._by_name.get(name)
 
-    except Exception:
-        return {"value": []}
+    def zones(self):
+        """NOAA zones in catalog order."""
+        return self._zones
+
+    def for_site(self, site_id):
+        """Specs reading a USGS site id (several rivers can share a gauge)."""
+        return self._by_site.get(site_id, ())
+
+COASTAL_SPECS = CoastalSpecRegistry(coastal_region_spec_literals())
+
+def load_coastal_region_specs():
+    """{region: (CoastalRiverSpec, ...)} from the prebuilt registry."""
+    return COASTAL_SPECS.regions()
+
+# ============================================================
+# COASTAL DASHBOARD — CHUNK 2: UTILITIES + HYDROLOGY LOGIC
+# ============================================================
+
+COASTAL_SERIES_HOURS = 72  # hydrology window (USGS period=P3D)
+
+# Rivers in flight at once during the precompute. Per-host request caps
+# live in http_client.
+COASTAL_MAX_WORKERS = 8
+
+def coastal_fetch_usgs_cached(site_id, param):
+    """72h USGS points for a site, read through the shared gauge store."""
+    return get_gauge_series(site_id, param, COASTAL_SERIES_HOURS)
+
+def coastal_fetch_usgs_batch(site_ids, param):
+    """
+    72h USGS points for many sites via grouped `sites=` requests.
+    Returns {site_id: points}; sites whose request failed are left out so
+    callers can retry them singly.
+    """
+    return get_gauge_series_many(site_ids, param, COASTAL_SERIES_HOURS)
+
+def coastal_prefetch_usgs(specs_by_region):
+    """
+    Batch-fetch every gauge in the catalog up front, grouped by parameter code.
+    Flow gauges that come back empty get a second grouped pass for stage (00065)
+    so the fallback in coastal_fetch_best_gauge never has to go one-by-one.
+    Returns {(site_id, param): points} for coastal_get_last_and_series.
+    """
+    sites_by_param = {}
+    for rivers in specs_by_region.values():
+        for spec in rivers:
+            for g in spec.get("Gauges", []):
+                sites = sites_by_param.setdefault(g["P"], [])
+                if g["ID"] not in sites:
+                    sites.append(g["ID"])
+
+    prefetched = {}
+    for param, sites in sites_by_param.items():
+        batch = coastal_fetch_usgs_batch(tuple(sites), param)
+        for site_id, points in batch.items():
+            prefetched[(site_id, param)] = points
+
+    # Stage fallback for flow gauges with no data (skipping known-dead stage feeds)
+    breaker = get_coastal_breaker()
+    missing_flow = [
+        site_id for site_id in sites_by_param.get("00060", [])
+        if (site_id, "00060") in prefetched
+        and not prefetched[(site_id, "00060")]
+        and (site_id, "00065") not in prefetched
+        and breaker.available("usgs", f"{site_id}:00065")
+    ]
+    if missing_flow:
+        batch = coastal_fetch_usgs_batch(tuple(missing_flow), "00065")
+        for site_id, points in batch.items():
+            prefetched[(site_id, "00065")] = points
+
+    return prefetched
 
 def coastal_fetch_nwrfc(site_id):
     """
@@ -1017,11 +1211,7 @@ def coastal_fetch_nwrfc(site_id):
     """
     try:
         url = f"https://www.nwrfc.noaa.gov/flows/json/flow_{site_id}.json"
-        # Added User-Agent
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        r = requests.get(url, headers=headers, timeout=6).json()
+        r = http_get(url).json()
 
         # NWRFC format: {"observed": [...], "forecast": [...]}
         obs = r.get("observed", [])
@@ -1038,233 +1228,147 @@ def coastal_fetch_nwrfc(site_id):
     except:
         return None, None
 
-def coastal_stage_to_flow(spec, stage_val):
-    """
-    Convert stage (ft) to approximate flow (cfs).
-    Uses simple linear models per river when available.
-    """
-    name = spec.get("Name", "").lower()
-
-    # Custom models (example coefficients)
-    MODELS = {
-        "navarro": (400, 350),      # flow = a*(stage - b)
-        "garcia": (300, 3.2),
-        "gualala": (280, 3.0),
-        "elk": (500, 3.6),
-        "sixes": (450, 4.2),
-    }
-
-    for key, (a, b) in MODELS.items():
-        if key in name:
-            return max(0, a * (stage_val - b))
-
-    # Generic fallback - REPLACED WITH None to trigger Behavioral Hydrology
-    return None
-
-def coastal_get_last_and_series(site_id, param):
-    raw = coastal_fetch_usgs_cached(site_id, param)
-    vals = raw.get("value", [])
-    if not vals:
-        return None, []
-
-    series = []
-    for v in vals:
-        try:
-            # Bulletproof Date Parsing
-            # USGS time format: "2023-12-28T14:30:00.000-08:00"
-            # We strip the offset because fromisoformat didn't support it in older pythons
-            # and relative time is enough for this app
-            dt_clean = v["dateTime"].split(".")[0]
-            if "+" in dt_clean:
-                dt_clean = dt_clean.split("+")[0]
-            elif "-" in dt_clean:
-                 # Be careful not to split the date part (2023-12-28)
-                 # Split from the end or just take first 19 chars: "YYYY-MM-DDTHH:MM:SS"
-                 dt_clean = v["dateTime"][:19]
-            
-            ts = dt.datetime.strptime(dt_clean, "%Y-%m-%dT%H:%M:%S")
-            val = float(v["value"])
-            series.append((ts, val))
-        except Exception:
-            continue
+def coastal_get_last_and_series(site_id, param, prefetched=None):
+    if prefetched is not None and (site_id, param) in prefetched:
+        points = prefetched[(site_id, param)]
+    else:
+        points = coastal_fetch_usgs_cached(site_id, param)
+    if not points:
+        return None, GaugeSeries()
 
-    if not series:
-        return None, []
+    series = GaugeSeries.from_points(points)
+    return series.last_value, series
 
-    series.sort(key=lambda x: x[0])
-    last_val = series[-1][1]
-    return last_val, series
+def coastal_empty_features(last_val=None):
+    """Feature record for a river with no readings."""
+    return {
+        "last_val": last_val,
+        "n_points": 0,
+        "last_time": None,
+        "peak_time": None,
+        "hours_since_peak": None,
+        "pct_change": None,
+        "slope": 0.0,
+        "pct_per_hour": None,
+        "trend_strength": "stable",
+        "score": 0.5,
+    }
 
-def coastal_compute_trend(series):
+def coastal_compute_trend(features):
     """
     Return arrow + pct change + trend keyword based on SHORT TERM (last 12h) data.
     Previously compared T-72h to T-0h which masked recent changes.
     """
-    if len(series) < 2:
-        return "↔", None, "↔ stable"
-
-    # Get recent slice (last 12 hours) to show CURRENT trend
-    end_time = series[-1][0]
-    cutoff = end_time - dt.timedelta(hours=12)
-    
-    # Filter for recent data points
-    recent_series = [s for s in series if s[0] >= cutoff]
-    
-    # Fallback to full series if not enough recent data (e.g. data gaps)
-    if len(recent_series) < 2:
-        recent_series = series
-
-    start_val = recent_series[0][1]
-    end_val = recent_series[-1][1]
-    
-    if start_val <= 0:
-        pct_change = None
-    else:
-        pct_change = (end_val - start_val) / start_val * 100.0
+    pct_change = features["pct_change"]
+    arrow, trend_text = coastal_trend_from_pct(pct_change)
+    return arrow, pct_change, trend_text
 
+def coastal_trend_from_pct(pct_change):
+    """(arrow, trend_text) for a 12h percent change (None = unknown)."""
     if pct_change is None:
-        arrow = "↔"
-        trend_text = "↔ stable"
-    elif pct_change > 5:
-        arrow = "↑"
-        trend_text = "↑ rising"
-    elif pct_change < -5:
-        arrow = "↓"
-        trend_text = "↓ dropping"
-    else:
-        arrow = "↔"
-        trend_text = "↔ stable"
-
-    return arrow, pct_change, trend_text
+        return "↔", "↔ stable"
+    if pct_change > 5:
+        return "↑", "↑ rising"
+    if pct_change < -5:
+        return "↓", "↓ dropping"
+    return "↔", "↔ stable"
+
+# Sparkline colors: segments by direction, plus peak and current markers
+COASTAL_SPARK_RISING = "#42A5F5"   # blue
+COASTAL_SPARK_DROPPING = "#66BB6A" # green
+COASTAL_SPARK_FLAT = "#9E9E9E"     # gray
+COASTAL_SPARK_PEAK = "#FFD700"     # gold
+COASTAL_SPARK_NOW = "#000000"
+COASTAL_SPARK_WIDTH = 96
+COASTAL_SPARK_HEIGHT = 18
 
 def coastal_make_sparkline_html(series, num_points=24):
     """
-    Return an HTML sparkline with colored segments (Blue=Rising, Green=Dropping)
-    and a peak marker.
+    Return a compact inline-SVG sparkline (Blue=Rising, Green=Dropping) with a
+    peak marker and a current-value dot. The SVG itself is cached on the
+    downsampled values, so unchanged gauges reuse the same string.
     """
+    series = GaugeSeries.from_points(series)
     if not series:
         return ""
     
     # Downsample
-    vals = [v for (_, v) in series]
+    vals = series.values
     if len(vals) > num_points:
         idx = np.linspace(0, len(vals) - 1, num_points).astype(int)
-        downsampled = [vals[i] for i in idx]
-    else:
-        downsampled = vals
+        vals = vals[idx]
 
-    if not downsampled:
-        return ""
+    return coastal_sparkline_svg(tuple(vals.tolist()))
 
-    min_v, max_v = min(downsampled), max(downsampled)
-    
-    # Normalize to 0-1
-    if max_v > min_v:
-        norm = [(v - min_v) / (max_v - min_v) for v in downsampled]
-    else:
-        norm = [0.5 for _ in downsampled]
+@lru_cache(maxsize=1024)
+def coastal_sparkline_svg(values):
+    """SVG markup for a tuple of (already downsampled) values."""
+    if not values:
+        return ""
 
-    levels = "▁▂▃▄▅▆▇█"
-    
-    # Find peak index for marker
-    peak_idx = downsampled.index(max(downsampled))
-    
-    html_parts = []
-    
-    for i, v_norm in enumerate(norm):
-        # Character selection
-        char_idx = int(v_norm * (len(levels) - 1))
-        char = levels[char_idx]
-        
-        # Color logic: Compare to previous point
-        color = "#9E9E9E" # Gray default
-        if i > 0:
-            if downsampled[i] > downsampled[i-1]:
-                color = "#42A5F5" # Blue (Rising)
-            elif downsampled[i] < downsampled[i-1]:
-                color = "#66BB6A" # Green (Dropping)
-        
-        # Add Peak Marker above character if this is the peak
-        # (Simplified: just coloring the peak differently or adding a marker char is tricky in inline text)
-        # We will just mark it with a distinct color or bold
-        if i == peak_idx:
-            # Gold for peak
-            html_parts.append(f"<span style='color:#FFD700; font-weight:bold;'>{char}</span>")
+    w, h, pad = COASTAL_SPARK_WIDTH, COASTAL_SPARK_HEIGHT, 2.5
+    n = len(values)
+    min_v, max_v = min(values), max(values)
+
+    def point(i):
+        x = pad + (w - 2 * pad) * (i / (n - 1) if n > 1 else 0.5)
+        # Normalize to 0-1 (flat series sits in the middle)
+        norm = (values[i] - min_v) / (max_v - min_v) if max_v > min_v else 0.5
+        y = pad + (1.0 - norm) * (h - 2 * pad)
+        return f"{x:.1f},{y:.1f}"
+
+    # One polyline per run of same-direction segments
+    runs = []
+    for i in range(1, n):
+        if values[i] > values[i - 1]:
+            color = COASTAL_SPARK_RISING
+        elif values[i] < values[i - 1]:
+            color = COASTAL_SPARK_DROPPING
         else:
-            html_parts.append(f"<span style='color:{color}'>{char}</span>")
-
-    # Add current marker
-    html_parts.append("<span style='color:#000000; font-weight:bold;'>●</span>")
-    
-    return "".join(html_parts)
-
-def coastal_time_since_peak(series):
-    """Return hours since the most recent peak in the last 72h."""
-    if not series:
-        return None
-
-    vals = [v for (_, v) in series]
-    peak_val = max(vals)
-    peak_index = vals.index(peak_val)
-    peak_time = series[peak_index][0]
-    now = series[-1][0]
-
-    delta = now - peak_time
-    return delta.total_seconds() / 3600.0
-
-def coastal_recession_rate(series):
-    """Return slope of last 24h. Positive = rising, negative = dropping."""
-    if len(series) < 2:
-        return 0.0
-
-    end_time = series[-1][0]
-    cutoff = end_time - dt.timedelta(hours=24)
-    recent = [v for v in series if v[0] >= cutoff]
-
-    if len(recent) < 2:
-        recent = series[-2:]
-
-    t0, v0 = recent[0]
-    t1, v1 = recent[-1]
-
-    hours = (t1 - t0).total_seconds() / 3600.0
-    if hours <= 0:
-        return 0.0
-
-    return (v1 - v0) / hours
-
-def coastal_basin_lag_modifier(spec, hours_since_peak):
-    """Return turbidity lag penalty or bonus based on basin type."""
-    t = spec.get("Type", "").lower()
-
-    if hours_since_peak is None:
-        return 0.0
-
-    if t == "flashy":
-        if hours_since_peak < 12:
-            return -0.2
-        elif hours_since_peak < 24:
-            return 0.0
+            color = COASTAL_SPARK_FLAT
+        if runs and runs[-1][0] == color:
+            runs[-1][1].append(i)
         else:
-            return +0.3
+            runs.append((color, [i - 1, i]))
 
-    if t == "mixed":
-        if hours_since_peak < 24:
-            return -0.3
-        elif hours_since_peak < 48:
-            return -0.1
-        else:
-            return +0.1
+    lines = "".join(
+        f'<polyline stroke="{color}" points="{" ".join(point(i) for i in idx)}"/>'
+        for color, idx in runs
+    )
 
-    if t in ["sedimentary", "glacial"]:
-        if hours_since_peak < 24:
-            return -0.7
-        elif hours_since_peak < 48:
-            return -0.4
-        else:
-            return 0.0
+    peak_x, peak_y = point(values.index(max_v)).split(",")
+    now_x, now_y = point(n - 1).split(",")
+    markers = (
+        f'<circle cx="{peak_x}" cy="{peak_y}" r="2.2" fill="{COASTAL_SPARK_PEAK}"/>'
+        f'<circle cx="{now_x}" cy="{now_y}" r="2" fill="{COASTAL_SPARK_NOW}"/>'
+    )
 
-    return 0.0
+    return (
+        f'<svg width="{w}" height="{h}" viewBox="0 0 {w} {h}" style="vertical-align:middle">'
+        f'<g fill="none" stroke-width="1.5" stroke-linejoin="round" stroke-linecap="round">{lines}</g>'
+        f"{markers}</svg>"
+    )
+
+def coastal_basin_lag_modifier(basin_types, hours_since_peak):
+    """
+    Turbidity lag penalty or bonus per river from its basin type and hours
+    since peak (arrays, one entry per river; unknown hours give 0.0).
+    """
+    h = np.asarray(hours_since_peak, dtype=np.float64)
+    flashy = np.array([t == CoastalBasinType.FLASHY for t in basin_types], dtype=bool)
+    mixed = np.array([t == CoastalBasinType.MIXED for t in basin_types], dtype=bool)
+    slow = np.array([t.slow_clearing for t in basin_types], dtype=bool)
+
+    out = np.select(
+        [flashy, mixed, slow],
+        [
+            np.select([h < 12, h < 24], [-0.2, 0.0], default=0.3),
+            np.select([h < 24, h < 48], [-0.3, -0.1], default=0.1),
+            np.select([h < 24, h < 48], [-0.7, -0.4], default=0.0),
+        ],
+        default=0.0,
+    )
+    return np.where(np.isnan(h), 0.0, out)
 
 # --- UPDATED: FLOW-AGNOSTIC HYDROLOGY ---
 def coastal_get_condition(val, spec, trend, hours_since_peak):
@@ -1299,23 +1403,14 @@ def coastal_get_condition(val, spec, trend, hours_since_peak):
     # 2. NUMERIC FLOW MODEL
     # ----------------------------------------------------
     
-    # Parse the "T" string (e.g., "1500-7500 cfs")
-    t_str = spec.get("T", "")
-    if not t_str:
-        return "unknown", "#FFFFFF"
-
-    try:
-        # Clean string: remove units and spaces
-        clean = t_str.lower().replace("cfs", "").replace("ft", "").strip()
-        parts = clean.split("-")
-        low_limit = float(parts[0])
-        high_limit = float(parts[1])
-    except:
-        # If format is weird, default to unknown
+    # Target range "T" (e.g., "1500-7500 cfs"), parsed once in the registry
+    if not spec.has_range:
+        # Missing or weird format -> unknown
         return "unknown", "#FFFFFF"
+    low_limit, high_limit = spec.lo, spec.hi
 
     # Check Low Water Limit (Legal or physical)
-    legal_low = spec.get("Low")
+    legal_low = spec.low
     if legal_low and val < legal_low:
         return "too low", "#E0E0E0" # Grey (Too Low) - Changed from Black/Closed
 
@@ -1333,12 +1428,93 @@ def coastal_get_condition(val, spec, trend, hours_since_peak):
     else:
         return "in shape", "#C8E6C9" # Green
 
-def coastal_fetch_best_gauge(gauges):
+# --- NEGATIVE CACHE / CIRCUIT BREAKER FOR DEAD SOURCES ---
+COASTAL_BREAKER_BASE_SECONDS = 600        # first back-off ~ one refresh cycle
+COASTAL_BREAKER_MAX_SECONDS = 6 * 3600    # never wait longer than this to re-probe
+
+class CoastalSourceBreaker:
+    """
+    Per-source failure tracking for the gauge fallback chain. Each (source, key)
+    that comes back empty is skipped until its retry time, which doubles with
+    every consecutive failure (capped). One success resets it.
+    """
+
+    def __init__(self, base=COASTAL_BREAKER_BASE_SECONDS, cap=COASTAL_BREAKER_MAX_SECONDS):
+        self.base = base
+        self.cap = cap
+        self._lock = threading.Lock()
+        self._state = {}  # (source, key) -> {"failures": n, "retry_at": epoch seconds}
+
+    def available(self, source, key):
+        with self._lock:
+            state = self._state.get((source, key))
+        return state is None or time.time() >= state["retry_at"]
+
+    def record_success(self, source, key):
+        with self._lock:
+            self._state.pop((source, key), None)
+
+    def record_failure(self, source, key):
+        with self._lock:
+            state = self._state.setdefault((source, key), {"failures": 0, "retry_at": 0.0})
+            state["failures"] += 1
+            delay = min(self.base * 2 ** (state["failures"] - 1), self.cap)
+            state["retry_at"] = time.time() + delay
+
+    def snapshot(self):
+        """Copy of the current state (for the debug panel)."""
+        with self._lock:
+            return {k: dict(v) for k, v in self._state.items()}
+
+@st.cache_resource
+def get_coastal_breaker():
+    return CoastalSourceBreaker()
+
+def coastal_get_guarded_series(site_id, param, prefetched=None):
+    """
+    coastal_get_last_and_series behind the breaker. Data already in the batch
+    prefetch is free, so it is always used; otherwise a known-dead source is
+    skipped until its retry time.
+    """
+    breaker = get_coastal_breaker()
+    key = f"{site_id}:{param}"
+    in_batch = prefetched is not None and (site_id, param) in prefetched
+    if not in_batch and not breaker.available("usgs", key):
+        return None, []
+
+    last_val, series = coastal_get_last_and_series(site_id, param, prefetched)
+    if last_val is not None and series:
+        breaker.record_success("usgs", key)
+    else:
+        breaker.record_failure("usgs", key)
+    return last_val, series
+
+def coastal_fetch_nwrfc_guarded(site_id):
+    """coastal_fetch_nwrfc behind the breaker."""
+    breaker = get_coastal_breaker()
+    if not breaker.available("nwrfc", site_id):
+        return None, None
+
+    val, ts = coastal_fetch_nwrfc(site_id)
+    if val is not None:
+        breaker.record_success("nwrfc", site_id)
+    else:
+        breaker.record_failure("nwrfc", site_id)
+    return val, ts
+
+def coastal_fetch_best_gauge(gauges, prefetched=None, unit=None):
     """
     Multi-source fetch with Confidence Icons:
     1. USGS primary -> 📡
     2. USGS fallback (Stage Trend) -> 📏
     3. NWRFC fallback -> 🧪
+
+    `prefetched` is the {(site_id, param): points} map from coastal_prefetch_usgs.
+    `unit` is the river's target unit. Stage is never converted to flow (no
+    published ratings are bundled): ft targets use the stage reading as
+    their value, cfs targets get the stage series for trend analysis only.
+    Sources that keep failing are skipped with back-off (CoastalSourceBreaker),
+    so a dead gauge goes straight to the modeled path.
     """
 
     for g in gauges:
@@ -1346,7 +1522,7 @@ def coastal_fetch_best_gauge(gauges):
         param = g["P"]
 
         # --- USGS ---
-        last_val, series = coastal_get_last_and_series(site_id, param)
+        last_val, series = coastal_get_guarded_series(site_id, param, prefetched)
         if last_val is not None and series:
             return {
                 "value": last_val,
@@ -1354,34 +1530,32 @@ def coastal_fetch_best_gauge(gauges):
                 "source": "USGS",
                 "confidence": "high",
                 "icon": "📡",
-                "timestamp": series[-1][0],
+                "timestamp": series.last_time,
                 "gauge_used": g,
             }
 
-        # --- USGS Fallback: Stage -> Flow Conversion ---
+        # --- USGS Fallback: Stage Trend ---
         # If primary mode was Flow (00060) and failed, try fetching Stage (00065)
         if param == "00060":
-            stage_last, stage_series = coastal_get_last_and_series(site_id, "00065")
+            stage_last, stage_series = coastal_get_guarded_series(site_id, "00065", prefetched)
             if stage_last is not None and stage_series:
-                flow_est = coastal_stage_to_flow(g, stage_last)
-                
-                # If flow_est is None, we still return the stage series for trend analysis
+                # No rating: keep the stage series for trend analysis only
                 return {
-                    "value": flow_est,
+                    "value": None,
                     "series": stage_series,
-                    "source": "USGS (Stage Est)" if flow_est else "USGS (Stage Trend)",
-                    "confidence": "medium" if flow_est else "low",
+                    "source": "USGS (Stage Trend)",
+                    "confidence": "low",
                     "icon": "📏",
-                    "timestamp": stage_series[-1][0],
+                    "timestamp": stage_series.last_time,
                     "gauge_used": g,
                 }
 
         # --- NWRFC fallback ---
-        nwrfc_val, nwrfc_time = coastal_fetch_nwrfc(site_id)
+        nwrfc_val, nwrfc_time = coastal_fetch_nwrfc_guarded(site_id)
         if nwrfc_val is not None:
             return {
                 "value": nwrfc_val,
-                "series": [],
+                "series": GaugeSeries(),
                 "source": "NWRFC",
                 "confidence": "low",
                 "icon": "🧪",
@@ -1389,25 +1563,28 @@ def coastal_fetch_best_gauge(gauges):
                 "gauge_used": g,
             }
 
-        # --- Stage→flow conversion (Legacy logic) ---
+        # --- Stage gauge (Legacy logic) ---
+        # Reuses the guarded probe above instead of fetching stage again, so an
+        # open breaker also keeps this path off the network
         if param == "00065":  # stage
-            stage_last, stage_series = coastal_get_last_and_series(site_id, "00065")
+            stage_last, stage_series = last_val, series
             if stage_last is not None:
-                flow_est = coastal_stage_to_flow(g, stage_last)
+                # ft targets: stage is the reading; otherwise trend only
+                value = stage_last if unit == "ft" else None
                 return {
-                    "value": flow_est,
+                    "value": value,
                     "series": stage_series,
                     "source": "stage-conversion",
                     "confidence": "low",
                     "icon": "📏",
-                    "timestamp": stage_series[-1][0] if stage_series else None,
+                    "timestamp": stage_series.last_time,
                     "gauge_used": g,
                 }
 
     # --- All failed ---
     return {
         "value": None,
-        "series": [],
+        "series": GaugeSeries(),
         "source": "none",
         "confidence": "none",
         "icon": "🚫",
@@ -1443,29 +1620,6 @@ def coastal_storm_cycle(trend_text, hours_since_peak):
         return ("Low/Clear", "💧", "#BBDEFB")
 
 
-def coastal_trend_strength(series, current_val):
-    """
-    Returns a qualitative trend strength indicator using PERCENT change per hour.
-    """
-    if len(series) < 2 or current_val is None or current_val == 0:
-        return "stable"
-
-    # Get raw slope (cfs per hour)
-    slope_cfs = coastal_recession_rate(series)
-    
-    # Convert to percent change per hour
-    pct_per_hour = (slope_cfs / current_val) * 100.0
-
-    if pct_per_hour > 5.0: # Rising > 5% per hour
-        return "strong rise"
-    if pct_per_hour > 1.0:
-        return "mild rise"
-    if pct_per_hour < -5.0: # Dropping > 5% per hour
-        return "strong drop"
-    if pct_per_hour < -1.0:
-        return "mild drop"
-    return "stable"
-
 # --- NEW FUNCTION FOR HUMAN READABLE TEXT ---
 def coastal_trend_strength_text(trend_strength, storm_cycle_label):
     # Normalize inputs
@@ -1496,12 +1650,12 @@ def coastal_trend_strength_text(trend_strength, storm_cycle_label):
     return trend_strength  # fallback
 
 def coastal_basin_lag_label(spec):
-    t = spec.get("Type", "").lower()
-    if t == "flashy":
+    t = spec.basin_type
+    if t == CoastalBasinType.FLASHY:
         return "Lag 6–12h"
-    if t == "mixed":
+    if t == CoastalBasinType.MIXED:
         return "Lag 12–24h"
-    if t in ["sedimentary", "glacial"]:
+    if t.slow_clearing:
         return "Lag 24–48h"
     return "Lag —"
 
@@ -1520,10 +1674,10 @@ def coastal_storm_window(hours_since_peak):
         return "Window Low/Clear"
 
 # --- NEW: PREDICTIVE WINDOW LOGIC ---
-def coastal_predict_window(val, spec, slope, cond_text, storm_cycle_label, storm_eta_hours):
+def coastal_predict_window(val, spec, slope, cond_text, storm_cycle_label, storm_stats):
     """
     Estimate when the river will open (reach target range).
-    Advanced logic with storm interruptions and basin lags.
+    Advanced logic with storm interruptions (CoastalStormStats) and basin lags.
     """
     # 1. Immediate Disqualifiers
     if val is None:
@@ -1535,15 +1689,10 @@ def coastal_predict_window(val, spec, slope, cond_text, storm_cycle_label, storm
     if storm_cycle_label in ["Rising", "Peak"]:
         return "⛔ Window blocked (Storm Active)"
 
-    # Parse target
-    t_str = spec.get("T", "")
-    try:
-        clean = t_str.lower().replace("cfs", "").replace("ft", "").strip()
-        parts = clean.split("-")
-        # high_limit is the target we want to get UNDER
-        high_limit = float(parts[1])
-    except:
+    # high_limit is the target we want to get UNDER
+    if not spec.has_range:
         return ""
+    high_limit = spec.hi
 
     # 2. Too High Check (> 1.8x upper limit)
     if val > (high_limit * 1.8):
@@ -1558,12 +1707,12 @@ def coastal_predict_window(val, spec, slope, cond_text, storm_cycle_label, storm
     drop_rate = abs(slope)
     
     # 4. Basin Penalty (Sedimentary clears slower)
-    basin_type = spec.get("Type", "mixed").lower()
-    multiplier = 1.5 if basin_type == "sedimentary" else 1.0
+    multiplier = 1.5 if spec.basin_type == CoastalBasinType.SEDIMENTARY else 1.0
     
     hours_to_go = (diff / drop_rate) * multiplier
     
     # 5. Storm Interruption Check
+    storm_eta_hours = storm_stats.eta_hours if storm_stats is not None else None
     if storm_eta_hours is not None and storm_eta_hours < hours_to_go:
         return f"⛔ Window blocked by next storm (ETA {storm_eta_hours}h)"
 
@@ -1577,71 +1726,132 @@ def coastal_predict_window(val, spec, slope, cond_text, storm_cycle_label, storm
 
 
 # ============================================================
-# NOAA STORM ETA
+# NOAA STORM STATS
 # ============================================================
+# Each NOAA zone's gridpoint forecast (nws_client.PrecipGrid: hourly PoP
+# and QPF arrays) is reduced once per refresh to a small CoastalStormStats
+# record. Every river in the zone shares it, and the window prediction, the
+# insight line and the map's storm-cycle heat weight all read from it.
+
+# NOAA_zone -> NWS gridpoint (office, x, y)
+COASTAL_NOAA_GRIDPOINTS = {
+    # CORRECTED NORCAL GRID POINTS
+    "CAC01": ("EKA", 50, 160),  # Smith River (Eureka)
+    "CAC02": ("EKA", 59, 97),   # Eel/Scotia (Eureka)
+    "CAC03": ("EKA", 89, 35),   # Navarro (Eureka)
+
+    # OREGON/WA (Existing)
+    "ORC01": ("MFR", 40, 60),
+    "ORC02": ("MFR", 35, 55),
+    "ORC03": ("PQR", 110, 80),
+    "ORC04": ("PQR", 120, 90),
+    "ORC05": ("PQR", 130, 100),
+    "ORC06": ("PQR", 140, 110),
+    "ORC07": ("PQR", 150, 120),
+    "ORC08": ("PQR", 160, 130),
+    "WAC01": ("SEW", 140, 80),
+    "WAC02": ("SEW", 150, 90),
+    "WAC03": ("SEW", 160, 100),
+    "WAC04": ("SEW", 170, 110),
+}
+
+COASTAL_STORM_POP = 50                    # % chance of precip that counts as "storm"
+COASTAL_STORM_HORIZONS = (48, 72)         # hours
+COASTAL_STORM_QPF_FULL = 1.0              # inches in 48h that max out intensity
+
+@dataclass(frozen=True)
+class CoastalStormStats:
+    """
+    Storm outlook for one NOAA zone, counted in hours from the current hour.
+    `eta_hours` is the first hour with PoP >= COASTAL_STORM_POP, or None.
+    `qpf` holds (horizon h, inches of forecast rain).
+    """
+    eta_hours: object
+    qpf: tuple
 
-def coastal_fetch_noaa_eta(spec):
+    def qpf_within(self, hours=72):
+        return dict(self.qpf).get(hours, 0.0)
+
+    @property
+    def intensity(self):
+        """0..1 weight from 48h rain, for the map's storm-cycle heat mode."""
+        return min(1.0, self.qpf_within(48) / COASTAL_STORM_QPF_FULL)
+
+def coastal_storm_stats(grid, now=None):
     """
-    Fetch NOAA hourly forecast and compute storm ETA.
-    Returns hours until next precip >= 50%.
+    Reduce a PrecipGrid to CoastalStormStats in a few array operations:
+    one threshold mask for the ETA and one cumulative sum for QPF.
+    None if the grid has no hours left.
     """
-    zone = spec.get("NOAA_zone")
-    if not zone:
+    if not grid:
+        return None
+    if now is None:
+        now = dt.datetime.now(dt.timezone.utc)
+
+    i0 = grid.hour_index(now)
+    lead = max(-i0, 0)  # grid starts in the future
+    pop = grid.pop[max(i0, 0):]
+    qpf = grid.qpf[max(i0, 0):]
+    if not len(pop):
         return None
 
-    try:
-        GRIDPOINTS = {
-            # CORRECTED NORCAL GRID POINTS
-            "CAC01": ("EKA", 50, 160),  # Smith River (Eureka)
-            "CAC02": ("EKA", 59, 97),   # Eel/Scotia (Eureka)
-            "CAC03": ("EKA", 89, 35),   # Navarro (Eureka)
-            
-            # OREGON/WA (Existing)
-            "ORC01": ("MFR", 40, 60),
-            "ORC02": ("MFR", 35, 55),
-            "ORC03": ("PQR", 110, 80),
-            "ORC04": ("PQR", 120, 90),
-            "ORC05": ("PQR", 130, 100),
-            "ORC06": ("PQR", 140, 110),
-            "ORC07": ("PQR", 150, 120),
-            "ORC08": ("PQR", 160, 130),
-            "WAC01": ("SEW", 140, 80),
-            "WAC02": ("SEW", 150, 90),
-            "WAC03": ("SEW", 160, 100),
-            "WAC04": ("SEW", 170, 110),
-        }
-
-        office, gx, gy = GRIDPOINTS.get(zone, (None, None, None))
-        if office is None:
-            return None
+    hit = pop >= COASTAL_STORM_POP
+    eta_hours = int(hit.argmax()) + lead if hit.any() else None
 
-        # Add User-Agent header to prevent 403 Forbidden
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        url = f"https://api.weather.gov/gridpoints/{office}/{gx},{gy}/forecast/hourly"
-        r = requests.get(url, headers=headers, timeout=5).json()
+    horizons = np.asarray(COASTAL_STORM_HORIZONS)
+    idx = np.clip(horizons - lead, 0, len(pop)) - 1
+    cum_qpf = np.cumsum(qpf, dtype=np.float64)
+    qpf_h = np.where(idx >= 0, cum_qpf[np.maximum(idx, 0)], 0.0).round(2).tolist()
 
-        periods = r.get("properties", {}).get("periods", [])
-        for i, p in enumerate(periods):
-            pop = p.get("probabilityOfPrecipitation", {}).get("value", 0)
-            if pop and pop >= 50:
-                return i  # hours until storm
+    return CoastalStormStats(
+        eta_hours=eta_hours,
+        qpf=tuple(zip(COASTAL_STORM_HORIZONS, qpf_h)),
+    )
 
+def coastal_zone_storm_stats(zone):
+    """CoastalStormStats for a NOAA zone from its cached gridpoint forecast."""
+    gridpoint = COASTAL_NOAA_GRIDPOINTS.get(zone)
+    if gridpoint is None:
         return None
-
+    try:
+        return coastal_storm_stats(get_precip_grid(*gridpoint))
     except Exception:
         return None
 
+def coastal_fetch_storm_stats(zones, max_workers=COASTAL_MAX_WORKERS):
+    """{zone: CoastalStormStats} with one forecast lookup per zone."""
+    zones = [z for z in dict.fromkeys(zones) if z]
+    if not zones:
+        return {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers or 1, len(zones)))) as pool:
+        return dict(zip(zones, pool.map(coastal_zone_storm_stats, zones)))
 
-def coastal_format_storm_eta(hours):
+def coastal_fetch_noaa_eta(spec):
+    """
+    Storm ETA for one river: hours until next precip >= 50%.
+    The precompute shares coastal_fetch_storm_stats across a zone instead.
+    """
+    zone = spec.get("NOAA_zone")
+    if not zone:
+        return None
+    stats = coastal_zone_storm_stats(zone)
+    return stats.eta_hours if stats is not None else None
+
+
+def coastal_format_storm_eta(stats):
+    hours = stats.eta_hours if stats is not None else None
     if hours is None:
         return "Storm ETA —"
     if hours == 0:
-        return "Storm ETA now"
-    if hours == 1:
-        return "Storm ETA 1h"
-    return f"Storm ETA {hours}h"
+        text = "Storm ETA now"
+    elif hours == 1:
+        text = "Storm ETA 1h"
+    else:
+        text = f"Storm ETA {hours}h"
+    rain = stats.qpf_within(72)
+    if rain >= 0.05:
+        text += f' ({rain:.1f}" in 72h)'
+    return text
 
 
 # ============================================================
@@ -1657,269 +1867,694 @@ def coastal_hydro_insight(storm_cycle, trend_strength, window, lag_label, storm_
     return f"{emoji} {trend_text} • {window} • {lag_label} • {storm_eta}"
 
 
-def coastal_score(last_val, spec, trend_text, series):
+# ============================================================
+# BATCH HYDROLOGY KERNEL
+# ============================================================
+# The one feature path: every river's feature record comes out of a single
+# vectorized pass. Gauges are padded into one matrix; the 12h and 24h window
+# starts for all rows come from one searchsorted over lag keys measured back
+# from each gauge's own latest reading, peaks from the padded value matrix,
+# and trend strength and score are array expressions over those columns.
+
+COASTAL_WINDOW_HOURS = (12, 24)  # pct-change window, recession-slope window
+
+def coastal_window_starts(series_list, lag_hours=COASTAL_WINDOW_HOURS):
+    """
+    Pad every series into a matrix and find each row's window starts.
+    Returns (idx, lengths, times, values):
+      idx     int  [n, len(lag_hours)]  first reading at or after each lag
+      lengths int  [n]
+      times   int  [n, maxlen] epoch seconds, padded with each row's last time
+      values  f64  [n, maxlen] padded with NaN
+    """
+    n = len(series_list)
+    lengths = np.array([len(s) for s in series_list], dtype=np.int64)
+    width = max(int(lengths.max()), 1)
+    valid = np.arange(width)[None, :] < lengths[:, None]
+    flat_times = np.concatenate([s.times for s in series_list]).view(np.int64)
+    starts = np.cumsum(lengths) - lengths
+    last_i = np.maximum(lengths - 1, 0)
+
+    # Scatter every series into its row; pad times with the row's last reading
+    ends = np.zeros(n, dtype=np.int64)
+    has = lengths > 0
+    ends[has] = flat_times[(starts + last_i)[has]]
+    times = np.broadcast_to(ends[:, None], (n, width)).copy()
+    times[valid] = flat_times
+    values = np.full((n, width), np.nan)
+    values[valid] = np.concatenate([s.values for s in series_list])
+
+    lags = np.asarray(lag_hours, dtype=np.int64) * 3600
+
+    # One searchsorted for all rows: shift each row into its own band so the
+    # flattened keys stay sorted (keys are "seconds before the row's last
+    # reading", all <= 0 within a band).
+    band = int(times.max() - times.min()) + int(lags.max()) + 1
+    offsets = np.arange(n, dtype=np.int64) * band
+    keys = (times - ends[:, None] + offsets[:, None])[valid]
+    queries = offsets[:, None] - lags[None, :]
+    idx = np.searchsorted(keys, queries, side="left") - starts[:, None]
+    idx = np.clip(idx, 0, last_i[:, None])
+
+    return idx, lengths, times, values
+
+def coastal_hydrology_batch(series_list, last_vals, specs):
     """
-    Calculate River Score (0.0 to 5.0) using percentage-based slopes
-    to treat small creeks and large rivers equally.
+    Feature records for many rivers in one pass, in order. Every classifier
+    and scorer works from these:
+      last_val          reported value (may differ from the series, e.g. stage est.)
+      n_points          readings in the series
+      last_time         latest reading (aware datetime)
+      peak_time         first highest reading
+      hours_since_peak  latest reading - peak_time, in hours
+      pct_change        % change over the last 12h (None if not computable)
+      slope             units/hour over the last 24h (+ rising, - dropping)
+      pct_per_hour      slope as % of last_val per hour (None without a value)
+      trend_strength    "strong rise" / "mild rise" / "stable" / "mild drop" / "strong drop"
+      score             river score, 0.0 to 5.0
     """
-    if last_val is None or last_val == 0:
-        return 0.5
+    series_list = [GaugeSeries.from_points(s) for s in series_list]
+    n = len(series_list)
+    if not n:
+        return []
+    idx, lengths, times, values = coastal_window_starts(series_list)
+    rows = np.arange(n)
+    last_i = np.maximum(lengths - 1, 0)
+    end_t = times[rows, last_i]
+    end_v = values[rows, last_i]
+
+    # 12h percent change (whole series if fewer than 2 readings in the window)
+    s12 = idx[:, 0]
+    s12 = np.where(lengths - s12 < 2, 0, s12)
+    v12 = values[rows, s12]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_change = np.where((lengths >= 2) & (v12 > 0), (end_v - v12) / v12 * 100.0, np.nan)
+
+    # 24h recession slope (last two readings if the window is too sparse)
+    s24 = idx[:, 1]
+    s24 = np.where(lengths - s24 < 2, np.maximum(lengths - 2, 0), s24)
+    span_h = (end_t - times[rows, s24]) / 3600.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where((lengths >= 2) & (span_h > 0), (end_v - values[rows, s24]) / span_h, 0.0)
+
+    # First highest reading
+    peak_i = np.argmax(np.where(np.isnan(values), -np.inf, values), axis=1)
+    hours_since_peak = np.where(lengths > 0, (end_t - times[rows, peak_i]) / 3600.0, np.nan)
+
+    # Slope as % of the reported value per hour
+    current = np.array([np.nan if v is None else float(v) for v in last_vals])
+    has_val = ~np.isnan(current) & (current != 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pct_per_hour = np.where(has_val & (lengths >= 2), slope / current * 100.0, np.nan)
+
+    trend_strength = np.select(
+        [pct_per_hour > 5.0, pct_per_hour > 1.0, pct_per_hour < -5.0, pct_per_hour < -1.0],
+        ["strong rise", "mild rise", "strong drop", "mild drop"],
+        default="stable",
+    )
 
-    try:
-        t_text = spec.get("T", "")
-        t_clean = t_text.replace("cfs", "").replace("ft", "").strip()
-        lo, hi = [float(x) for x in t_clean.split("-")]
-        mid = (lo + hi) / 2
-    except Exception:
-        return 1.0
-
-    # 1. Flow Score (Is it in the target range?)
-    if last_val < lo:
-        flow_score = 0.5
-    elif lo <= last_val <= hi:
-        dist = abs(last_val - mid)
-        span = hi - lo if hi > lo else 1.0
-        proximity = max(0.0, 1.0 - dist / span)
-        flow_score = 1.0 + proximity
-    else:
-        flow_score = 0.5
+    # Score: flow position + trend direction + recession rate + basin lag
+    # + time since peak, using percentage slopes so creeks and big rivers
+    # are treated alike
+    lo = np.array([sp.lo if sp.has_range else np.nan for sp in specs], dtype=np.float64)
+    hi = np.array([sp.hi if sp.has_range else np.nan for sp in specs], dtype=np.float64)
+    mid = (lo + hi) / 2
+    in_range = (lo <= current) & (current <= hi)
+    span = np.where(hi > lo, hi - lo, 1.0)
+    flow_score = np.where(in_range, 1.0 + np.maximum(0.0, 1.0 - np.abs(current - mid) / span), 0.5)
+
+    rising = pct_change > 5      # same cut-offs as coastal_trend_from_pct
+    dropping = pct_change < -5
+    trend_score = np.select(
+        [rising, dropping & (current > hi), dropping & in_range],
+        [0.0, 1.0, 1.5],
+        default=0.5,
+    )
 
-    # 2. Trend Score (Direction)
-    if "↑" in trend_text:
-        trend_score = 0.0
-    elif "↓" in trend_text:
-        if last_val > hi:
-            trend_score = 1.0
-        elif lo <= last_val <= hi:
-            trend_score = 1.5
-        else:
-            trend_score = 0.5
-    else:
-        trend_score = 0.5
+    rate = np.nan_to_num(pct_per_hour, nan=0.0)
+    rec_score = np.select([rate < -5.0, rate < -1.0, rate < 0], [0.5, 0.3, 0.1], default=0.0)
 
-    # 3. Recession Score (Rate of Drop) - NORMALIZED
-    slope = coastal_recession_rate(series)
-    pct_per_hour = (slope / last_val) * 100.0
-    
-    if pct_per_hour < -5.0: # Dropping fast (>5%/hr)
-        rec_score = 0.5
-    elif pct_per_hour < -1.0: # Dropping steadily
-        rec_score = 0.3
-    elif pct_per_hour < 0: # Dropping slowly
-        rec_score = 0.1
-    else:
-        rec_score = 0.0
+    lag_score = coastal_basin_lag_modifier([sp.basin_type for sp in specs], hours_since_peak)
 
-    hours_since_peak = coastal_time_since_peak(series)
-    lag_score = coastal_basin_lag_modifier(spec, hours_since_peak)
+    h = hours_since_peak
+    tsp_score = np.select(
+        [np.isnan(h), h < 12, h < 24, h < 48],
+        [0.0, 0.0, 0.3, 0.7],
+        default=1.0,
+    )
 
-    if hours_since_peak is None:
-        tsp_score = 0.0
-    elif hours_since_peak < 12:
-        tsp_score = 0.0
-    elif hours_since_peak < 24:
-        tsp_score = 0.3
-    elif hours_since_peak < 48:
-        tsp_score = 0.7
-    else:
-        tsp_score = 1.0
+    score = np.clip(flow_score + trend_score + rec_score + lag_score + tsp_score, 0.0, 5.0)
+    score = np.where(np.isnan(lo), 1.0, score)
+    score = np.where(has_val, score, 0.5)
 
-    score = flow_score + trend_score + rec_score + lag_score + tsp_score
-    return max(0.0, min(5.0, score))
+    # Back to plain Python values for the records (NaN -> None)
+    columns = zip(
+        lengths.tolist(), end_t.tolist(), times[rows, peak_i].tolist(), hours_since_peak.tolist(),
+        pct_change.tolist(), slope.tolist(), pct_per_hour.tolist(),
+        trend_strength.tolist(), score.tolist(),
+    )
+    records = []
+    for s, last_val, (k, t_end, t_peak, hsp, pct, slp, pph, strength, sc) in zip(series_list, last_vals, columns):
+        if not k:
+            record = coastal_empty_features(last_val)
+            record["score"] = sc
+            records.append(record)
+            continue
+        records.append({
+            "last_val": last_val,
+            "n_points": k,
+            "last_time": dt.datetime.fromtimestamp(t_end, tz=s.tz),
+            "peak_time": dt.datetime.fromtimestamp(t_peak, tz=s.tz),
+            "hours_since_peak": hsp,
+            "pct_change": None if pct != pct else pct,
+            "slope": slp,
+            "pct_per_hour": None if pph != pph else pph,
+            "trend_strength": strength,
+            "score": sc,
+        })
+    return records
 
 # ============================================================
 # SAFE PRECOMPUTE LOOP
 # ============================================================
 
-def coastal_precompute_all_rivers():
+COASTAL_STALE_SECONDS = 6 * 3600  # entries older than this get the 🕒 icon
+
+def coastal_empty_entry(spec):
+    """Placeholder entry for a river whose pipeline failed outright."""
+    return {
+        "spec": spec,
+        "last_val": None,
+        "series": GaugeSeries(),
+        "cond_text": "no data",
+        "cond_color": "#CCCCCC",
+        "arrow": "↔",
+        "pct_change": None,
+        "trend_text": "↔ stable",
+        "spark": "",
+        "score": 0.5,
+        "confidence": "none",
+        "source": "none",
+        "timestamp": None,
+        "time_str": "",
+        "gauge_used": None,
+        "is_modeled": False,
+        "icon": "🚫",
+
+        # Storm-cycle defaults
+        "storm_cycle": ("Unknown", "❔", "#E0E0E0"),
+        "trend_strength": "stable",
+        "lag_label": "Lag —",
+        "window": "Window —",
+        "storm_eta": "Storm ETA —",
+        "storm_stats": None,
+        "hydro_insight": "❔ Unknown • stable • Window — • Lag — • Storm ETA —",
+    }
+
+
+def coastal_fetch_river(spec, prefetched=None, storm_stats=None):
+    """
+    Network half of the per-river pipeline: best gauge (with the synthetic
+    series patch) and the NOAA storm stats. `storm_stats` is the per-zone
+    map from coastal_fetch_storm_stats; without it they are looked up here.
+    Returns None if it blew up.
+    """
+    try:
+        gauges = spec.get("Gauges", [])
+
+        # Fetch Data
+        fetch = coastal_fetch_best_gauge(gauges, prefetched, spec.unit)
+        last_val = fetch["value"]
+        series = fetch["series"]
+        icon = fetch["icon"]
+
+        # ------------------------------------------------------------
+        # SYNTHETIC SERIES PATCH (ALWAYS ACTIVATE BEHAVIORAL HYDROLOGY)
+        # ------------------------------------------------------------
+        is_modeled = False
+        if not series:
+            is_modeled = True
+            icon = "🧪" # Force synthetic icon
+            now = dt.datetime.now(dt.timezone.utc)
+
+            # If we have a last_val, use it; otherwise use a neutral placeholder
+            if last_val is not None:
+                base = float(last_val)
+            else:
+                base = 100.0  # neutral placeholder for ungauged rivers
+
+            # Force a clear drop so trend = dropping
+            series = GaugeSeries.from_points([
+                (now - dt.timedelta(hours=1), base * 1.10),
+                (now, base)
+            ])
+
+        # NOAA Storm Stats (Safely Wrapped)
+        try:
+            if storm_stats is not None:
+                zone_stats = storm_stats.get(spec.get("NOAA_zone"))
+            else:
+                zone_stats = coastal_zone_storm_stats(spec.get("NOAA_zone"))
+        except:
+            zone_stats = None
+
+        return {
+            "spec": spec,
+            "fetch": fetch,
+            "last_val": last_val,
+            "series": series,
+            "icon": icon,
+            "is_modeled": is_modeled,
+            "storm_stats": zone_stats,
+        }
+    except Exception:
+        return None
+
+def coastal_assemble_river_entry(river, features):
+    """
+    Turn one fetched river plus its feature record into a dashboard entry.
+    Never raises; failures come back as coastal_empty_entry.
+    """
+    spec = river["spec"]
+    try:
+        fetch = river["fetch"]
+        last_val = river["last_val"]
+        series = river["series"]
+        icon = river["icon"]
+        storm_stats = river["storm_stats"]
+        timestamp = fetch["timestamp"]
+
+        # ------------------------------------------------------------
+        # Trend + Sparkline HTML
+        # ------------------------------------------------------------
+        # Use updated short-term trend logic (last 12h)
+        arrow, pct_change, trend_text = coastal_compute_trend(features)
+        hours_since_peak = features["hours_since_peak"]
+        slope = features["slope"] # Needed for prediction
+        spark = coastal_make_sparkline_html(series) # Use HTML version
+
+        # ------------------------------------------------------------
+        # Condition Classification (Behavioral + Numeric)
+        # ------------------------------------------------------------
+        cond_text, cond_color = coastal_get_condition(
+            last_val,
+            spec,
+            trend_text,
+            hours_since_peak
+        )
+
+        # ------------------------------------------------------------
+        # Hydrology Score
+        # ------------------------------------------------------------
+        score = features["score"]
+
+        # ------------------------------------------------------------
+        # Timestamp Formatting + Stale Check
+        # ------------------------------------------------------------
+        time_str = timestamp.strftime("%m/%d %H:%M") if timestamp else ""
+        # Check if stale (older than 6 hours)
+        if timestamp and (dt.datetime.now(dt.timezone.utc) - timestamp).total_seconds() > COASTAL_STALE_SECONDS:
+            icon = "🕒" # Stale icon
+
+        # ------------------------------------------------------------
+        # STORM-CYCLE INTELLIGENCE
+        # ------------------------------------------------------------
+        storm_cycle = coastal_storm_cycle(trend_text, hours_since_peak)
+
+        # Trend strength is normalized by the current value (pct_per_hour)
+        trend_strength = features["trend_strength"]
+
+        lag_label = coastal_basin_lag_label(spec)
+        window = coastal_storm_window(hours_since_peak)
+        storm_eta = coastal_format_storm_eta(storm_stats)
+
+        # Hydrology Insight Line
+        hydro_insight = coastal_hydro_insight(
+            storm_cycle,
+            trend_strength,
+            window,
+            lag_label,
+            storm_eta
+        )
+
+        # Predictive Window
+        storm_label = storm_cycle[0]
+        prediction = coastal_predict_window(
+            last_val, 
+            spec, 
+            slope, 
+            cond_text, 
+            storm_label, 
+            storm_stats
+        )
+
+        if prediction:
+            hydro_insight += f"<br>{prediction}"
+
+        # ------------------------------------------------------------
+        # Build Entry
+        # ------------------------------------------------------------
+        entry = {
+            "spec": spec,
+            "last_val": last_val,
+            "series": series,
+            "cond_text": cond_text,
+            "cond_color": cond_color,
+            "arrow": arrow,
+            "pct_change": pct_change,
+            "trend_text": trend_text,
+            "spark": spark,
+            "score": score,
+            "confidence": fetch["confidence"],
+            "source": fetch["source"],
+            "timestamp": timestamp,
+            "time_str": time_str,
+            "gauge_used": fetch["gauge_used"],
+            "is_modeled": river["is_modeled"],
+            "icon": icon,
+
+            # Storm-cycle intelligence
+            "storm_cycle": storm_cycle,
+            "trend_strength": trend_strength,
+            "lag_label": lag_label,
+            "window": window,
+            "storm_eta": storm_eta,
+            "storm_stats": storm_stats,
+            "hydro_insight": hydro_insight,
+        }
+
+    except Exception as e:
+        # print(f"❌ Error processing {spec.get('Name')}: {e}") # Uncomment to debug
+        return coastal_empty_entry(spec)
+
+    return entry
+
+# --- PER-RIVER MEMO ---
+# A river whose gauge hasn't posted, whose spec hasn't changed and whose
+# storm stats are the same gets exactly the same entry as last time, so the
+# precompute reuses it instead of re-deriving features, condition, score,
+# insight text and sparkline HTML.
+
+class CoastalEntryMemo:
+    """River name -> (fingerprint, entry) from the most recent build."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, name, fingerprint):
+        with self._lock:
+            hit = self._entries.get(name)
+        if hit is not None and hit[0] == fingerprint:
+            return hit[1]
+        return None
+
+    def put(self, name, fingerprint, entry):
+        with self._lock:
+            self._entries[name] = (fingerprint, entry)
+
+    def retain(self, names):
+        """Forget rivers that are no longer in the catalog."""
+        names = set(names)
+        with self._lock:
+            for name in list(self._entries):
+                if name not in names:
+                    del self._entries[name]
+
+@st.cache_resource
+def get_coastal_entry_memo():
+    return CoastalEntryMemo()
+
+def coastal_spec_version(spec):
+    """Changes whenever anything in the river's spec does (specs are frozen)."""
+    return hash(spec)
+
+def coastal_river_fingerprint(river):
+    """
+    Everything a river's entry is derived from: the gauge reading (last
+    timestamp, point count, value), which source answered, the spec version,
+    the zone's storm stats, and whether the reading has gone stale since.
+    """
+    fetch = river["fetch"]
+    timestamp = fetch["timestamp"]
+    if river["is_modeled"]:
+        # The synthetic series is rebuilt around "now" every time; only its
+        # base value matters.
+        series_fp = ("modeled", river["last_val"])
+    else:
+        series_fp = river["series"].fingerprint()
+
+    stale = isinstance(timestamp, dt.datetime) and (
+        (dt.datetime.now(dt.timezone.utc) - timestamp).total_seconds() > COASTAL_STALE_SECONDS
+    )
+    return (
+        series_fp,
+        str(timestamp),
+        fetch["source"],
+        river["last_val"],
+        coastal_spec_version(river["spec"]),
+        river["storm_stats"],
+        stale,
+    )
+
+def coastal_assemble_entries(rivers, specs, memo=None):
+    """
+    Batch feature extraction over all fetched rivers, then one entry per river.
+    With a memo, rivers whose fingerprint is unchanged reuse their previous
+    entry and only the rest go through the hydrology pass.
+    """
+    entries = [coastal_empty_entry(spec) for spec in specs]
+
+    changed = []
+    fingerprints = {}
+    for i, river in enumerate(rivers):
+        if river is None:
+            continue
+        if memo is not None:
+            fingerprints[i] = coastal_river_fingerprint(river)
+            hit = memo.get(specs[i].name, fingerprints[i])
+            if hit is not None:
+                entries[i] = hit
+                continue
+        changed.append(i)
+
+    if not changed:
+        return entries
+
+    try:
+        features = coastal_hydrology_batch(
+            [rivers[i]["series"] for i in changed],
+            [rivers[i]["last_val"] for i in changed],
+            [specs[i] for i in changed],
+        )
+    except Exception:
+        return entries
+
+    for i, f in zip(changed, features):
+        entries[i] = coastal_assemble_river_entry(rivers[i], f)
+        if memo is not None:
+            memo.put(specs[i].name, fingerprints[i], entries[i])
+    return entries
+
+def coastal_prefetch_catalog(specs_by_region):
+    """
+    Shared network prefetch for a precompute: the grouped USGS map and the
+    per-zone storm stats, fetched side by side. Either half comes back as
+    None on failure, and the per-river fetch then looks it up itself.
+    """
+    with ThreadPoolExecutor(max_workers=1) as side:
+        stats_future = side.submit(coastal_fetch_storm_stats, COASTAL_SPECS.zones())
+        try:
+            prefetched = coastal_prefetch_usgs(specs_by_region)
+        except Exception:
+            prefetched = None
+        try:
+            storm_stats = stats_future.result()
+        except Exception:
+            storm_stats = None
+    return prefetched, storm_stats
+
+def coastal_precompute_all_rivers(max_workers=COASTAL_MAX_WORKERS):
     """
     Precompute hydrology, conditions, scoring, and metadata for all rivers.
+    Fetches run concurrently on up to `max_workers` threads (per-host request
+    caps still apply), feature extraction runs once over the whole catalog
+    (coastal_hydrology_batch); the result keeps region and river order.
     """
     specs_by_region = load_coastal_region_specs()
-    out = {}
 
-    for region_name, rivers in specs_by_region.items():
-        region_entries = []
+    # Grouped USGS requests for the whole catalog instead of one per river,
+    # and one storm-stats record per NOAA zone
+    prefetched, storm_stats = coastal_prefetch_catalog(specs_by_region)
 
-        for spec in rivers:
-            try:
-                gauges = spec.get("Gauges", [])
-
-                # Fetch Data
-                fetch = coastal_fetch_best_gauge(gauges)
-                last_val = fetch["value"]
-                series = fetch["series"]
-                gauge_used = fetch["gauge_used"]
-                source = fetch["source"]
-                confidence = fetch["confidence"]
-                timestamp = fetch["timestamp"]
-                icon = fetch["icon"]
-
-                # ------------------------------------------------------------
-                # SYNTHETIC SERIES PATCH (ALWAYS ACTIVATE BEHAVIORAL HYDROLOGY)
-                # ------------------------------------------------------------
-                is_modeled = False
-                if not series:
-                    is_modeled = True
-                    icon = "🧪" # Force synthetic icon
-                    now = dt.datetime.utcnow()
-
-                    # If we have a last_val, use it; otherwise use a neutral placeholder
-                    if last_val is not None:
-                        base = float(last_val)
-                    else:
-                        base = 100.0  # neutral placeholder for ungauged rivers
-
-                    # Force a clear drop so trend = dropping
-                    series = [
-                        (now - dt.timedelta(hours=1), base * 1.10),
-                        (now, base)
-                    ]
-
-                # ------------------------------------------------------------
-                # Trend + Sparkline HTML
-                # ------------------------------------------------------------
-                # Use updated short-term trend logic (last 12h)
-                arrow, pct_change, trend_text = coastal_compute_trend(series)
-                spark = coastal_make_sparkline_html(series) # Use HTML version
-                hours_since_peak = coastal_time_since_peak(series)
-                slope = coastal_recession_rate(series) # Needed for prediction
-
-                # ------------------------------------------------------------
-                # Condition Classification (Behavioral + Numeric)
-                # ------------------------------------------------------------
-                cond_text, cond_color = coastal_get_condition(
-                    last_val,
-                    spec,
-                    trend_text,
-                    hours_since_peak
-                )
+    jobs = [
+        (region_name, spec)
+        for region_name, rivers in specs_by_region.items()
+        for spec in rivers
+    ]
 
-                # ------------------------------------------------------------
-                # Hydrology Score
-                # ------------------------------------------------------------
-                score = coastal_score(last_val, spec, trend_text, series)
-
-                # ------------------------------------------------------------
-                # Timestamp Formatting + Stale Check
-                # ------------------------------------------------------------
-                time_str = timestamp.strftime("%m/%d %H:%M") if timestamp else ""
-                # Check if stale (older than 6 hours)
-                if timestamp and (dt.datetime.utcnow() - timestamp).total_seconds() > 21600:
-                    icon = "🕒" # Stale icon
-
-                # ------------------------------------------------------------
-                # STORM-CYCLE INTELLIGENCE
-                # ------------------------------------------------------------
-                storm_cycle = coastal_storm_cycle(trend_text, hours_since_peak)
-                
-                # Pass current value to trend strength for normalization
-                trend_strength = coastal_trend_strength(series, last_val)
-                
-                lag_label = coastal_basin_lag_label(spec)
-                window = coastal_storm_window(hours_since_peak)
-
-                # NOAA Storm ETA (Safely Wrapped)
-                try:
-                    eta_hours = coastal_fetch_noaa_eta(spec)
-                except:
-                    eta_hours = None
-                storm_eta = coastal_format_storm_eta(eta_hours)
-
-                # Hydrology Insight Line
-                hydro_insight = coastal_hydro_insight(
-                    storm_cycle,
-                    trend_strength,
-                    window,
-                    lag_label,
-                    storm_eta
-                )
-                
-                # Predictive Window
-                # Updated logic call
-                storm_label = storm_cycle[0]
-                prediction = coastal_predict_window(
-                    last_val, 
-                    spec, 
-                    slope, 
-                    cond_text, 
-                    storm_label, 
-                    eta_hours
-                )
-                
-                if prediction:
-                    hydro_insight += f"<br>{prediction}"
-
-                # ------------------------------------------------------------
-                # Build Entry
-                # ------------------------------------------------------------
-                entry = {
-                    "spec": spec,
-                    "last_val": last_val,
-                    "series": series,
-                    "cond_text": cond_text,
-                    "cond_color": cond_color,
-                    "arrow": arrow,
-                    "pct_change": pct_change,
-                    "trend_text": trend_text,
-                    "spark": spark,
-                    "score": score,
-                    "confidence": confidence,
-                    "source": source,
-                    "timestamp": timestamp,
-                    "time_str": time_str,
-                    "gauge_used": gauge_used,
-                    "is_modeled": is_modeled,
-                    "icon": icon,
-
-                    # Storm-cycle intelligence
-                    "storm_cycle": storm_cycle,
-                    "trend_strength": trend_strength,
-                    "lag_label": lag_label,
-                    "window": window,
-                    "storm_eta": storm_eta,
-                    "hydro_insight": hydro_insight,
-                }
+    def run(job):
+        return coastal_fetch_river(job[1], prefetched, storm_stats)
 
-            except Exception as e:
-                # print(f"❌ Error processing {spec.get('Name')}: {e}") # Uncomment to debug
-                # Add this write to see error in app if needed:
-                # st.write(f"DEBUG: Error for {spec.get('Name')}: {e}")
-
-                entry = {
-                    "spec": spec,
-                    "last_val": None,
-                    "series": [],
-                    "cond_text": "no data",
-                    "cond_color": "#CCCCCC",
-                    "arrow": "↔",
-                    "pct_change": None,
-                    "trend_text": "↔ stable",
-                    "spark": "",
-                    "score": 0.5,
-                    "confidence": "none",
-                    "source": "none",
-                    "timestamp": None,
-                    "time_str": "",
-                    "gauge_used": None,
-                    "is_modeled": False,
-                    "icon": "🚫",
-
-                    # Storm-cycle defaults
-                    "storm_cycle": ("Unknown", "❔", "#E0E0E0"),
-                    "trend_strength": "stable",
-                    "lag_label": "Lag —",
-                    "window": "Window —",
-                    "storm_eta": "Storm ETA —",
-                    "hydro_insight": "❔ Unknown • stable • Window — • Lag — • Storm ETA —",
-                }
+    # Network-bound fetches in parallel, then one vectorized hydrology pass
+    if max_workers and max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            rivers = list(pool.map(run, jobs))
+    else:
+        rivers = [run(job) for job in jobs]
 
-            region_entries.append(entry)
+    # Unchanged rivers come straight from the memo
+    memo = get_coastal_entry_memo()
+    specs = [spec for _, spec in jobs]
+    memo.retain(spec.name for spec in specs)
+    entries = coastal_assemble_entries(rivers, specs, memo)
 
-        out[region_name] = region_entries
+    out = {region_name: [] for region_name in specs_by_region}
+    for (region_name, _), entry in zip(jobs, entries):
+        out[region_name].append(entry)
 
     return out
 
+def coastal_precompute_stream(max_workers=COASTAL_MAX_WORKERS):
+    """
+    Streaming variant of coastal_precompute_all_rivers for a cold start:
+    yields (region_name, entries) as soon as every river in that region has
+    been fetched, so the first regions can be painted while slow gauges in
+    others are still loading. All fetches still share one pool; each region
+    gets its own hydrology batch. Regions arrive in completion order.
+    """
+    specs_by_region = load_coastal_region_specs()
+    prefetched, storm_stats = coastal_prefetch_catalog(specs_by_region)
+
+    memo = get_coastal_entry_memo()
+    memo.retain(spec.name for spec in COASTAL_SPECS)
+
+    rivers = {region_name: [None] * len(specs) for region_name, specs in specs_by_region.items()}
+    pending = {region_name: len(specs) for region_name, specs in specs_by_region.items()}
+
+    # Regions with no rivers are done before anything is fetched
+    for region_name, left in pending.items():
+        if not left:
+            yield region_name, []
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers or 1)) as pool:
+        futures = {
+            pool.submit(coastal_fetch_river, spec, prefetched, storm_stats): (region_name, i)
+            for region_name, specs in specs_by_region.items()
+            for i, spec in enumerate(specs)
+        }
+        for future in as_completed(futures):
+            region_name, i = futures[future]
+            rivers[region_name][i] = future.result()
+            pending[region_name] -= 1
+            if pending[region_name] == 0:
+                specs = specs_by_region[region_name]
+                yield region_name, coastal_assemble_entries(rivers[region_name], specs, memo)
+
+# ============================================================
+# BACKGROUND SNAPSHOT REFRESHER
+# ============================================================
+
+COASTAL_REFRESH_SECONDS = 600  # matches the gauge store TTL
+
+class CoastalSnapshot(dict):
+    """
+    One finished precompute, {region: [entries]}, shared by every session and
+    page. Treat it as read-only. `version` goes up by one per rebuild;
+    `token` is unique to this snapshot even across refresher restarts (the map
+    page caches its dataframe on it); `built_at` is the aware UTC build time.
+    """
+
+    def __init__(self, data, version, built_at, build_seconds):
+        super().__init__(data)
+        self.version = version
+        self.token = uuid.uuid4().hex
+        self.built_at = built_at
+        self.build_seconds = build_seconds
+
+    def age_minutes(self):
+        return (dt.datetime.now(dt.timezone.utc) - self.built_at).total_seconds() / 60.0
+
+class CoastalRefresher:
+    """
+    One per server process. A daemon thread rebuilds coastal_precompute_all_rivers
+    on a schedule and swaps the finished CoastalSnapshot in with a single
+    reference assignment, so readers always see a complete snapshot and never
+    wait on upstream APIs (except for the very first build after startup).
+    """
+
+    def __init__(self, interval=COASTAL_REFRESH_SECONDS):
+        self.interval = interval
+        self._snapshot = None
+        self._partial = {}
+        self._version = 0
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="coastal-refresher", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                started = time.monotonic()
+                data = self._build()
+                self._version += 1
+                self._snapshot = CoastalSnapshot(
+                    data,
+                    version=self._version,
+                    built_at=dt.datetime.now(dt.timezone.utc),
+                    build_seconds=time.monotonic() - started,
+                )
+            except Exception:
+                pass  # keep serving the previous snapshot
+            finally:
+                self._ready.set()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _build(self):
+        if self._snapshot is not None:
+            return coastal_precompute_all_rivers()
+
+        # First build: stream regions into _partial so the dashboard can
+        # paint them before the whole catalog is done
+        partial = {}
+        self._partial = partial
+        for region_name, entries in coastal_precompute_stream():
+            partial[region_name] = entries
+        return {region_name: partial.get(region_name, []) for region_name in COASTAL_SPECS.regions()}
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def partial(self):
+        """Regions finished so far by the first build ({} once it is over)."""
+        return {} if self._ready.is_set() else dict(self._partial)
+
+    def latest(self, timeout=None):
+        """Latest completed snapshot; blocks only until the first build finishes."""
+        self._ready.wait(timeout)
+        return self._snapshot
+
+    def refresh_now(self):
+        """Start the next rebuild immediately instead of waiting out the interval."""
+        self._wake.set()
+
+@st.cache_resource
+def get_coastal_refresher():
+    return CoastalRefresher()
+
+def get_coastal_snapshot():
+    """
+    The shared CoastalSnapshot (None if the first build failed). Only the very
+    first caller after startup waits, behind a spinner.
+    """
+    refresher = get_coastal_refresher()
+    if refresher.is_ready():
+        return refresher.latest()
+    with st.spinner("Loading river conditions..."):
+        return refresher.latest()
+
 # ============================================================
 # UI + MAIN RENDER
 # ============================================================
@@ -1934,30 +2569,40 @@ def coastal_get_tile_text_color_from_bg(bg):
     luminance = (0.299 * r + 0.587 * g + 0.114 * b)
     return "#000000" if luminance > 160 else "#FFFFFF"
 
-def coastal_tile(name, flow_str, range_str, status_str, time_str, spark, trend_line, meta_line, hydro_insight, bg, fg, icon, is_modeled=False):
-    # Font style logic
-    style = f"background-color:{bg}; color:{fg}; padding:6px 8px; border-radius:5px; margin-bottom:4px; font-size:0.80rem; line-height:1.35;"
-    if is_modeled:
-        style += " font-style: italic;"
-
-    # Use standard f-string but ensure no leading whitespace that Markdown might interpret as code
-    html = f"""
-<div style="{style}">
-    <div style="display:flex; justify-content:flex-start; align-items:center;">
-        <span style="font-weight:700; font-size:0.9rem; margin-right: 10px;">{name} {icon}</span>
-        <span style="font-weight:700; font-size:0.9rem;">{flow_str}</span>
-    </div>
-    <div style="opacity:0.9;">{range_str} • {status_str}</div>
-    <div style="display:flex; justify-content:space-between; margin-top:2px;">
-        <span>{spark} {trend_line}</span>
-    </div>
-    <div style="font-size:0.70rem; opacity:0.8; margin-top:4px;">
-        {meta_line} • {time_str}<br>
-        {hydro_insight}
-    </div>
-</div>
-"""
-    st.markdown(html, unsafe_allow_html=True)
+# Shared tile styles, injected once per page render (coastal_inject_tile_css)
+# so each tile only carries its own colors:
+#   ct = tile, ct-mod = modeled (italic), ct-h = header row, ct-n = name,
+#   ct-f = flow, ct-s = range/status, ct-t = sparkline/trend, ct-m = meta
+COASTAL_TILE_CSS = """<style>
+.ct{padding:6px 8px;border-radius:5px;margin-bottom:4px;font-size:0.80rem;line-height:1.35}
+.ct-mod{font-style:italic}
+.ct-h{display:flex;justify-content:flex-start;align-items:center}
+.ct-n{font-weight:700;font-size:0.9rem;margin-right:10px}
+.ct-f{font-weight:700;font-size:0.9rem}
+.ct-s{opacity:0.9}
+.ct-t{display:flex;justify-content:space-between;margin-top:2px}
+.ct-m{font-size:0.70rem;opacity:0.8;margin-top:4px}
+</style>"""
+
+def coastal_inject_tile_css():
+    st.markdown(COASTAL_TILE_CSS, unsafe_allow_html=True)
+
+def coastal_tile_html(name, flow_str, range_str, status_str, time_str, spark, trend_line, meta_line, hydro_insight, bg, fg, icon, is_modeled=False):
+    """One river tile as a single line of HTML (no leading whitespace, so Markdown leaves it alone)."""
+    cls = "ct ct-mod" if is_modeled else "ct"
+    return (
+        f'<div class="{cls}" style="background-color:{bg};color:{fg}">'
+        f'<div class="ct-h"><span class="ct-n">{name} {icon}</span><span class="ct-f">{flow_str}</span></div>'
+        f'<div class="ct-s">{range_str} • {status_str}</div>'
+        f'<div class="ct-t"><span>{spark} {trend_line}</span></div>'
+        f'<div class="ct-m">{meta_line} • {time_str}<br>{hydro_insight}</div>'
+        f"</div>"
+    )
+
+def coastal_emit_tiles(tiles):
+    """Send a whole list of tiles to the browser as one Markdown element."""
+    if tiles:
+        st.markdown("".join(tiles), unsafe_allow_html=True)
 
 def coastal_render_filters():
     st.subheader("Filters")
@@ -1995,6 +2640,66 @@ def coastal_render_filters():
         "stable": show_stable,
     }
 
+def coastal_region_summary_html(region_name, entries):
+    """Summary card (counts, storm phases, fishable share) for one region."""
+    # Counts
+    total = len(entries)
+    measured = sum(1 for e in entries if not e.get("is_modeled", False))
+    estimated = total - measured
+    
+    # Storm Cycle Phase Counts
+    rising = sum(1 for e in entries if "Rising" in e.get("storm_cycle", [""])[0])
+    peaking = sum(1 for e in entries if "Peak" in e.get("storm_cycle", [""])[0])
+    # Group Dropping and Post-Storm together for brevity
+    dropping = sum(1 for e in entries if "Drop" in e.get("storm_cycle", [""])[0] or "Post" in e.get("storm_cycle", [""])[0])
+    
+    # Window Coverage
+    in_window = sum(1 for e in entries if "OPEN" in e.get("window", ""))
+    
+    # Badge Logic
+    pct_window = (in_window / total * 100) if total > 0 else 0
+    if pct_window >= 40:
+        badge = "🔥 Hot"
+        badge_bg = "#FEE2E2" # Light red/orange
+        badge_col = "#991B1B"
+    elif pct_window >= 15:
+        badge = "🟡 Mixed"
+        badge_bg = "#FEF3C7"
+        badge_col = "#92400E"
+    elif sum(1 for e in entries if e["cond_text"] == "blown out") > (total * 0.4):
+        badge = "🟥 Blown"
+        badge_bg = "#FEE2E2"
+        badge_col = "#B91C1C"
+    else:
+        badge = "❄️ Cold"
+        badge_bg = "#EFF6FF"
+        badge_col = "#1E40AF"
+
+    # HTML Card
+    tile_html = f"""
+    <div style='background-color:#FFFFFF; padding:12px; border-radius:8px; margin-bottom:12px; border:1px solid #E5E7EB; box-shadow: 0 1px 2px rgba(0,0,0,0.05);'>
+        <div style='display:flex; justify-content:space-between; align-items:center; margin-bottom:8px;'>
+            <span style='font-weight:700; font-size:1rem; color:#111827;'>{region_name}</span>
+            <span style='font-size:0.75rem; background-color:{badge_bg}; color:{badge_col}; padding:2px 8px; border-radius:12px; font-weight:600;'>{badge}</span>
+        </div>
+        <div style='font-size:0.8rem; color:#4B5563; line-height:1.5;'>
+            <div style='display:flex; justify-content:space-between;'>
+                <span>📡 <b>{measured}</b> Meas.</span>
+                <span>🧪 <b>{estimated}</b> Est.</span>
+            </div>
+            <div style='margin-top:4px; border-top:1px solid #F3F4F6; padding-top:4px;'>
+                <span title='Rising'>🌧️ {rising}</span> &nbsp; 
+                <span title='Peaking'>🌊 {peaking}</span> &nbsp; 
+                <span title='Dropping/Post'>📉 {dropping}</span>
+            </div>
+            <div style='margin-top:4px; font-weight:500; color:#059669;'>
+                🎯 {in_window} Rivers Fishable ({pct_window:.0f}%)
+            </div>
+        </div>
+    </div>
+    """
+    return tile_html
+
 def coastal_render_region_summary(coastal_data):
     st.subheader("Region Summary")
 
@@ -2003,63 +2708,7 @@ def coastal_render_region_summary(coastal_data):
 
     for i, (region_name, entries) in enumerate(regions):
         with cols[i % 3]:
-            # Counts
-            total = len(entries)
-            measured = sum(1 for e in entries if not e.get("is_modeled", False))
-            estimated = total - measured
-            
-            # Storm Cycle Phase Counts
-            rising = sum(1 for e in entries if "Rising" in e.get("storm_cycle", [""])[0])
-            peaking = sum(1 for e in entries if "Peak" in e.get("storm_cycle", [""])[0])
-            # Group Dropping and Post-Storm together for brevity
-            dropping = sum(1 for e in entries if "Drop" in e.get("storm_cycle", [""])[0] or "Post" in e.get("storm_cycle", [""])[0])
-            
-            # Window Coverage
-            in_window = sum(1 for e in entries if "OPEN" in e.get("window", ""))
-            
-            # Badge Logic
-            pct_window = (in_window / total * 100) if total > 0 else 0
-            if pct_window >= 40:
-                badge = "🔥 Hot"
-                badge_bg = "#FEE2E2" # Light red/orange
-                badge_col = "#991B1B"
-            elif pct_window >= 15:
-                badge = "🟡 Mixed"
-                badge_bg = "#FEF3C7"
-                badge_col = "#92400E"
-            elif sum(1 for e in entries if e["cond_text"] == "blown out") > (total * 0.4):
-                badge = "🟥 Blown"
-                badge_bg = "#FEE2E2"
-                badge_col = "#B91C1C"
-            else:
-                badge = "❄️ Cold"
-                badge_bg = "#EFF6FF"
-                badge_col = "#1E40AF"
-
-            # HTML Card
-            tile_html = f"""
-            <div style='background-color:#FFFFFF; padding:12px; border-radius:8px; margin-bottom:12px; border:1px solid #E5E7EB; box-shadow: 0 1px 2px rgba(0,0,0,0.05);'>
-                <div style='display:flex; justify-content:space-between; align-items:center; margin-bottom:8px;'>
-                    <span style='font-weight:700; font-size:1rem; color:#111827;'>{region_name}</span>
-                    <span style='font-size:0.75rem; background-color:{badge_bg}; color:{badge_col}; padding:2px 8px; border-radius:12px; font-weight:600;'>{badge}</span>
-                </div>
-                <div style='font-size:0.8rem; color:#4B5563; line-height:1.5;'>
-                    <div style='display:flex; justify-content:space-between;'>
-                        <span>📡 <b>{measured}</b> Meas.</span>
-                        <span>🧪 <b>{estimated}</b> Est.</span>
-                    </div>
-                    <div style='margin-top:4px; border-top:1px solid #F3F4F6; padding-top:4px;'>
-                        <span title='Rising'>🌧️ {rising}</span> &nbsp; 
-                        <span title='Peaking'>🌊 {peaking}</span> &nbsp; 
-                        <span title='Dropping/Post'>📉 {dropping}</span>
-                    </div>
-                    <div style='margin-top:4px; font-weight:500; color:#059669;'>
-                        🎯 {in_window} Rivers Fishable ({pct_window:.0f}%)
-                    </div>
-                </div>
-            </div>
-            """
-            st.markdown(tile_html, unsafe_allow_html=True)
+            st.markdown(coastal_region_summary_html(region_name, entries), unsafe_allow_html=True)
 
 def coastal_filter_entry(e, filters):
     cond = e["cond_text"]
@@ -2098,14 +2747,7 @@ def coastal_render_top3(coastal_data, filters):
         pct = e["pct_change"] or 0
         last = e["last_val"] or 999999
         spec = e["spec"]
-        try:
-            t_text = spec.get("T", "")
-            t_clean = t_text.replace("cfs", "").replace("ft", "").strip()
-            lo, hi = [float(x) for x in t_clean.split("-")]
-            mid = (lo + hi) / 2
-            dist = abs(last - mid)
-        except Exception:
-            dist = 999999
+        dist = abs(last - spec.mid) if spec.has_range else 999999
         return (-score, -pct, dist)
 
     top3 = sorted(filtered_rivers, key=sort_key)[:3]
@@ -2114,6 +2756,7 @@ def coastal_render_top3(coastal_data, filters):
         st.write("No rivers match filters.")
         return
 
+    tiles = []
     for region_name, entry in top3:
         spec = entry["spec"]
         name = f"{spec.get('Name')} ({region_name})"
@@ -2171,7 +2814,7 @@ def coastal_render_top3(coastal_data, filters):
         hydro_insight = entry.get("hydro_insight", "")
         icon = entry.get("icon", "🚫")
 
-        coastal_tile(
+        tiles.append(coastal_tile_html(
             name=name,
             flow_str=flow_str,
             range_str=range_str,
@@ -2185,107 +2828,106 @@ def coastal_render_top3(coastal_data, filters):
             fg=fg,
             icon=icon,
             is_modeled=is_modeled
-        )
+        ))
 
-def coastal_render_regions(coastal_data, filters):
-    st.subheader("📍 Coastal Regions")
+    coastal_emit_tiles(tiles)
 
-    for region_name, entries in coastal_data.items():
-        with st.expander(region_name, expanded=False):
+def coastal_render_region_tiles(entries, filters):
+    """Tiles for one region's rivers that pass the filters, best score first."""
+    filtered = [e for e in entries if coastal_filter_entry(e, filters)]
 
-            filtered = [e for e in entries if coastal_filter_entry(e, filters)]
+    if not filtered:
+        st.write("No rivers match filters.")
+        return
 
-            if not filtered:
-                st.write("No rivers match filters.")
-                continue
+    filtered.sort(key=lambda x: x["score"], reverse=True)
 
-            filtered.sort(key=lambda x: x["score"], reverse=True)
+    tiles = []
+    for entry in filtered:
+        spec = entry["spec"]
+        name = spec.get("Name", "Unknown")
 
-            for entry in filtered:
-                spec = entry["spec"]
-                name = spec.get("Name", "Unknown")
+        last_val = entry["last_val"]
+        t_range = spec.get("T", "")
+        cond_text = entry["cond_text"]
 
-                last_val = entry["last_val"]
-                t_range = spec.get("T", "")
-                cond_text = entry["cond_text"]
+        gauge = entry.get("gauge_used") or {}
+        param = gauge.get("P", "")
+        unit = "ft" if "ft" in t_range else "cfs"
+        
+        # Check if estimated logic applies
+        is_modeled = entry.get("is_modeled", False)
 
-                gauge = entry.get("gauge_used") or {}
-                param = gauge.get("P", "")
-                unit = "ft" if "ft" in t_range else "cfs"
+        if last_val is None:
+            flow_str = "—"
+            if is_modeled:
+                flow_str = "— Predicted Hydrology"
                 
-                # Check if estimated logic applies
-                is_modeled = entry.get("is_modeled", False)
-
-                if last_val is None:
-                    flow_str = "—"
-                    if is_modeled:
-                        flow_str = "— Predicted Hydrology"
-                        
-                    range_str = t_range or "—"
-                    if cond_text != "no data":
-                        status_map = {
-                            "blown out": "🟥 Blown out",
-                            "slightly high": "🟠 Slightly high",
-                            "in shape": "✅ In range",
-                            "low": "🟡 Low",
-                        }
-                        status_str = status_map.get(cond_text, cond_text)
-                    else:
-                        status_str = "⚠️ No data"
-                else:
-                    status_map = {
-                        "below legal": "⛔ Below legal",
-                        "too low": "Too Low",
-                        "blown out": "🟥 Blown Out",
-                        "low": "🟡 Low",
-                        "slightly high": "🟠 Slightly High",
-                        "in shape": "✅ In Range",
-                    }
-                    status_str = status_map.get(cond_text, cond_text)
-                    flow_str = f"{last_val:.2f} {unit}" if unit == "ft" else f"{last_val:.0f} {unit}"
-                    range_str = f"Target: {t_range}"
-
-                spark = entry["spark"]
-                arrow = entry["arrow"]
-                pct = entry["pct_change"]
-                pct_str = f"{pct:+.1f}%" if pct is not None else "—"
-                trend_line = f"{arrow} {pct_str}"
-
-                bg = entry["cond_color"]
-                fg = coastal_get_tile_text_color_from_bg(bg)
-
-                # ⭐ NEW: storm-cycle + hydrology insight
-                hydro_insight = entry.get("hydro_insight", "")
-                icon = entry.get("icon", "🚫")
-
-                coastal_tile(
-                    name=name,
-                    flow_str=flow_str,
-                    range_str=range_str,
-                    status_str=status_str,
-                    time_str=entry.get("time_str", ""),
-                    spark=spark,
-                    trend_line=trend_line,
-                    meta_line=f"{entry.get('source', '?')} ({entry.get('confidence', '?')})",
-                    hydro_insight=hydro_insight,
-                    bg=bg,
-                    fg=fg,
-                    icon=icon,
-                    is_modeled=is_modeled
-                )
+            range_str = t_range or "—"
+            if cond_text != "no data":
+                status_map = {
+                    "blown out": "🟥 Blown out",
+                    "slightly high": "🟠 Slightly high",
+                    "in shape": "✅ In range",
+                    "low": "🟡 Low",
+                }
+                status_str = status_map.get(cond_text, cond_text)
+            else:
+                status_str = "⚠️ No data"
+        else:
+            status_map = {
+                "below legal": "⛔ Below legal",
+                "too low": "Too Low",
+                "blown out": "🟥 Blown Out",
+                "low": "🟡 Low",
+                "slightly high": "🟠 Slightly High",
+                "in shape": "✅ In Range",
+            }
+            status_str = status_map.get(cond_text, cond_text)
+            flow_str = f"{last_val:.2f} {unit}" if unit == "ft" else f"{last_val:.0f} {unit}"
+            range_str = f"Target: {t_range}"
 
-# ============================================================
-# EXPORTED CONTEXT FUNCTION (FOR MAP)
-# ============================================================
-def get_dashboard_context():
-    """
-    Returns the raw precomputed data and a default set of filters.
-    Used by external modules (like map or planner) to access dashboard logic.
-    """
-    data = coastal_precompute_all_rivers()
-    
-    # Default filters (Everything ON)
-    filters = {
+        spark = entry["spark"]
+        arrow = entry["arrow"]
+        pct = entry["pct_change"]
+        pct_str = f"{pct:+.1f}%" if pct is not None else "—"
+        trend_line = f"{arrow} {pct_str}"
+
+        bg = entry["cond_color"]
+        fg = coastal_get_tile_text_color_from_bg(bg)
+
+        # ⭐ NEW: storm-cycle + hydrology insight
+        hydro_insight = entry.get("hydro_insight", "")
+        icon = entry.get("icon", "🚫")
+
+        tiles.append(coastal_tile_html(
+            name=name,
+            flow_str=flow_str,
+            range_str=range_str,
+            status_str=status_str,
+            time_str=entry.get("time_str", ""),
+            spark=spark,
+            trend_line=trend_line,
+            meta_line=f"{entry.get('source', '?')} ({entry.get('confidence', '?')})",
+            hydro_insight=hydro_insight,
+            bg=bg,
+            fg=fg,
+            icon=icon,
+            is_modeled=is_modeled
+        ))
+
+    coastal_emit_tiles(tiles)
+
+def coastal_render_regions(coastal_data, filters):
+    st.subheader("📍 Coastal Regions")
+
+    for region_name, entries in coastal_data.items():
+        with st.expander(region_name, expanded=False):
+            coastal_render_region_tiles(entries, filters)
+
+def coastal_default_filters():
+    """Every condition and trend switched on."""
+    return {
         "in_shape": True,
         "low": True,
         "slightly_high": True,
@@ -2296,6 +2938,63 @@ def get_dashboard_context():
         "dropping": True,
         "stable": True,
     }
+
+def coastal_render_progressive(refresher, poll_seconds=0.25):
+    """
+    Cold start only: while the refresher's first build is running, paint each
+    region (summary card + tiles) the moment it finishes. Returns once the
+    full snapshot is ready, clearing the interim view.
+    """
+    region_names = list(COASTAL_SPECS.regions())
+    filters = coastal_default_filters()
+
+    shell = st.empty()
+    with shell.container():
+        progress = st.progress(0.0, text="Loading river conditions...")
+        slots = {region_name: st.empty() for region_name in region_names}
+
+    painted = set()
+    while not refresher.is_ready():
+        for region_name, entries in refresher.partial().items():
+            if region_name in painted or region_name not in slots:
+                continue
+            painted.add(region_name)
+            with slots[region_name].container():
+                st.markdown(coastal_region_summary_html(region_name, entries), unsafe_allow_html=True)
+                with st.expander(region_name, expanded=True):
+                    coastal_render_region_tiles(entries, filters)
+            progress.progress(
+                len(painted) / len(region_names),
+                text=f"Loaded {len(painted)} of {len(region_names)} regions...",
+            )
+        time.sleep(poll_seconds)
+
+    shell.empty()
+
+@fragment
+def coastal_render_filtered_views(coastal_data):
+    """
+    Filters plus the views that depend on them. Runs as a fragment, so a
+    checkbox toggle re-renders only the top 3 and the region tiles against
+    the snapshot already on the page, not the whole dashboard.
+    """
+    filters = coastal_render_filters()
+    coastal_render_top3(coastal_data, filters)
+    coastal_render_regions(coastal_data, filters)
+
+# ============================================================
+# EXPORTED CONTEXT FUNCTION (FOR MAP)
+# ============================================================
+def get_dashboard_context():
+    """
+    Returns the raw precomputed data and a default set of filters.
+    Used by external modules (like map or planner) to access dashboard logic.
+    The data is the same shared snapshot the dashboard renders.
+    """
+    data = get_coastal_snapshot() or {}
+    
+    # Default filters (Everything ON)
+    filters = coastal_default_filters()
     return data, filters
 
 # ============================================================
@@ -2304,16 +3003,43 @@ def get_dashboard_context():
 def render_coastal_dashboard():
     st.title("🌊 Coastal Conditions Dashboard")
 
-    # PRECOMPUTE ONCE AT LOAD TIME
-    COASTAL_PRECOMPUTED = coastal_precompute_all_rivers()
+    coastal_inject_tile_css()
 
-    filters = coastal_render_filters()
+    # LATEST SNAPSHOT FROM THE BACKGROUND REFRESHER
+    # (right after startup, regions are painted as the first build finishes them)
+    refresher = get_coastal_refresher()
+    if not refresher.is_ready():
+        coastal_render_progressive(refresher)
+    COASTAL_PRECOMPUTED = get_coastal_snapshot()
+
+    if not COASTAL_PRECOMPUTED:
+        st.warning("River conditions are not available yet.")
+        return
+
+    st.caption(
+        f"Conditions updated {COASTAL_PRECOMPUTED.age_minutes():.0f} min ago "
+        f"(snapshot #{COASTAL_PRECOMPUTED.version})"
+    )
 
     coastal_render_region_summary(COASTAL_PRECOMPUTED)
-    coastal_render_top3(COASTAL_PRECOMPUTED, filters)
-    coastal_render_regions(COASTAL_PRECOMPUTED, filters)
+    coastal_render_filtered_views(COASTAL_PRECOMPUTED)
 
     with st.expander("🛠 Debug: Gauge Diagnostics", expanded=False):
+        st.write(
+            f"Snapshot #{COASTAL_PRECOMPUTED.version} built "
+            f"{COASTAL_PRECOMPUTED.built_at:%Y-%m-%d %H:%M:%S} UTC "
+            f"in {COASTAL_PRECOMPUTED.build_seconds:.1f}s"
+        )
+        if st.button("🔄 Rebuild snapshot now", help="Gauges still inside their cache TTL are not re-fetched"):
+            get_coastal_refresher().refresh_now()
+            st.info("Rebuild started; the new snapshot shows up on a later rerun.")
+        backoff = get_coastal_breaker().snapshot()
+        if backoff:
+            st.markdown("### Sources in back-off")
+            for (source, key), state in sorted(backoff.items()):
+                retry_in = max(0, int(state["retry_at"] - time.time()))
+                rivers = ", ".join(spec.name for spec in COASTAL_SPECS.for_site(key.split(":")[0])) or "?"
+                st.write(f"{source} {key} ({rivers}): {state['failures']} failures, retry in {retry_in // 60} min")
         for region, entries in COASTAL_PRECOMPUTED.items():
             st.markdown(f"### {region}")
             for e in entries:
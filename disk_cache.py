@@ -0,0 +1,150 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ============================================================
+# PERSISTENT DISK CACHE (SQLITE)
+# ============================================================
+# Small key/value cache that survives deploys and container restarts, so a
+# fresh process can serve its first page from disk instead of going cold
+# against USGS/NWS. Values are JSON; each row remembers when it was stored.
+#
+# Freshness follows stale-while-revalidate:
+#   age < ttl                 -> fresh, serve it
+#   age < ttl + stale_ttl     -> serve it now, refresh in the background
+#   older / missing           -> load synchronously
+#
+# If the cache file can't be opened (read-only disk, etc.) every call just
+# falls through to the loader.
+
+CACHE_DIR = os.environ.get(
+    "STEELHEAD_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache"),
+)
+CACHE_PATH = os.path.join(CACHE_DIR, "steelhead_cache.sqlite")
+
+
+class DiskCache:
+    """Thread-safe SQLite store of (namespace, key) -> (stored_at, JSON payload)."""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._inflight = set()
+        self._conn = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " stored_at REAL NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._conn = conn
+        except (OSError, sqlite3.Error):
+            self._conn = None
+
+    def get(self, namespace, key):
+        """Return (value, age_seconds) or (None, None)."""
+        if self._conn is None:
+            return None, None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT stored_at, payload FROM entries WHERE namespace=? AND key=?",
+                    (namespace, key),
+                ).fetchone()
+        except sqlite3.Error:
+            return None, None
+        if row is None:
+            return None, None
+        return json.loads(row[1]), time.time() - row[0]
+
+    def put(self, namespace, key, value):
+        self.put_many(namespace, {key: value})
+
+    def put_many(self, namespace, items):
+        """Write several keys of one namespace in a single transaction."""
+        if self._conn is None or not items:
+            return
+        now = time.time()
+        rows = [(namespace, key, now, json.dumps(value)) for key, value in items.items()]
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (namespace, key, stored_at, payload)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+        except sqlite3.Error:
+            pass
+
+    def read_through(self, namespace, key, loader, ttl, stale_ttl=0):
+        """
+        Serve (namespace, key) from disk under stale-while-revalidate rules,
+        calling `loader()` when it has to. A loader result of None is treated
+        as a failed fetch: nothing is stored and any older copy is returned.
+        """
+        return self.read_through_with_age(namespace, key, loader, ttl, stale_ttl)[0]
+
+    def read_through_with_age(self, namespace, key, loader, ttl, stale_ttl=0):
+        """
+        read_through, returning (value, age_seconds) so callers holding the
+        value in memory can expire it with the disk copy. A fresh load has age
+        0; (None, None) if nothing was available.
+        """
+        value, age = self.get(namespace, key)
+        if value is not None and age < ttl:
+            return value, age
+
+        if value is not None and age < ttl + stale_ttl:
+            self.revalidate(namespace, key, loader)
+            return value, age
+
+        fresh = loader()
+        if fresh is None:
+            return value, age
+        self.put(namespace, key, fresh)
+        return fresh, 0.0
+
+    def revalidate(self, namespace, key, loader):
+        """Refresh one key on a background thread (at most one per key)."""
+        token = (namespace, key)
+        with self._lock:
+            if token in self._inflight:
+                return
+            self._inflight.add(token)
+
+        def run():
+            try:
+                fresh = loader()
+                if fresh is not None:
+                    self.put(namespace, key, fresh)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._inflight.discard(token)
+
+        threading.Thread(target=run, name=f"revalidate-{namespace}", daemon=True).start()
+
+
+_DISK_CACHE = None
+_DISK_CACHE_LOCK = threading.Lock()
+
+
+def get_disk_cache():
+    """The process-wide DiskCache (opened lazily on first use)."""
+    global _DISK_CACHE
+    with _DISK_CACHE_LOCK:
+        if _DISK_CACHE is None:
+            _DISK_CACHE = DiskCache()
+        return _DISK_CACHE
@@ -0,0 +1,507 @@
+import streamlit as st
+import datetime as dt
+import numpy as np
+import threading
+import time
+from urllib.parse import quote
+
+from disk_cache import get_disk_cache
+from http_client import http_get
+
+# ============================================================
+# SHARED USGS GAUGE STORE
+# ============================================================
+# One process-wide store keyed by (site_id, param) that both the planner
+# and the coastal dashboard read through. Each key keeps the WIDEST window
+# anyone has asked for; narrower requests are served by slicing, so the
+# planner's 8h/24h views ride on the dashboard's 72h fetch (and vice versa).
+# Once a key is held, refreshes ask USGS only for readings since the last
+# cached timestamp (startDT) and roll them into the buffer.
+# Buffers are mirrored to the disk cache, so a restarted process starts warm;
+# a buffer that is only a little stale is served immediately and refreshed
+# on a background thread.
+
+USGS_IV_URL = "https://waterservices.usgs.gov/nwis/iv/"
+USGS_BATCH_SIZE = 40        # sites per grouped IV request
+GAUGE_TTL_SECONDS = 600     # same freshness the old st.cache_data(ttl=600) gave
+GAUGE_STALE_SECONDS = 7200  # past TTL, still served while a refresh runs
+GAUGE_DISK_NAMESPACE = "usgs_iv"
+
+
+class GaugeSeries:
+    """
+    Compact gauge time series: sorted UTC datetime64[s] times plus float32
+    values (~12 bytes/point instead of a (datetime, float) tuple). Slicing by
+    time window is a searchsorted, and hydrology code can work on the arrays
+    directly. Iterating or indexing still yields (aware datetime, float) pairs
+    in `tz` (the gauge's own UTC offset), so tuple-based callers keep working.
+    """
+
+    __slots__ = ("times", "values", "tz")
+
+    def __init__(self, times=(), values=(), tz=dt.timezone.utc):
+        self.times = np.asarray(times, dtype="datetime64[s]")
+        self.values = np.asarray(values, dtype=np.float32)
+        self.tz = tz
+
+    @classmethod
+    def from_points(cls, points, tz=None):
+        """Build from (datetime, float) pairs; aware times are converted to UTC."""
+        if isinstance(points, GaugeSeries):
+            return points
+        points = list(points)
+        if tz is None:
+            tz = (points[-1][0].tzinfo if points else None) or dt.timezone.utc
+
+        times, values = [], []
+        for t, v in points:
+            if t.tzinfo is not None:
+                t = t.astimezone(dt.timezone.utc).replace(tzinfo=None)
+            times.append(t)
+            values.append(v)
+
+        return cls(np.array(times, dtype="datetime64[s]"), values, tz).sorted()
+
+    def sorted(self):
+        """This series in time order (itself if it already is)."""
+        if len(self) < 2 or np.all(self.times[1:] >= self.times[:-1]):
+            return self
+        order = np.argsort(self.times, kind="stable")
+        return GaugeSeries(self.times[order], self.values[order], self.tz)
+
+    def __len__(self):
+        return len(self.values)
+
+    def __bool__(self):
+        return len(self.values) > 0
+
+    def __iter__(self):
+        for t, v in zip(self.times, self.values):
+            yield self.to_datetime(t), self.to_float(v)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, (slice, np.ndarray)):
+            return GaugeSeries(self.times[idx], self.values[idx], self.tz)
+        return self.to_datetime(self.times[idx]), self.to_float(self.values[idx])
+
+    def __repr__(self):
+        return f"GaugeSeries({len(self)} points)"
+
+    def to_datetime(self, t64):
+        """datetime64[s] (UTC) -> aware datetime in this series' timezone."""
+        return dt.datetime.fromtimestamp(int(t64.view(np.int64)), tz=self.tz)
+
+    @staticmethod
+    def to_float(v):
+        """float32 -> Python float without the float32 noise (510.4, not 510.3999938...)."""
+        return float(str(v))
+
+    @staticmethod
+    def to_datetime64(t):
+        """Aware (or naive UTC) datetime -> UTC datetime64[s]."""
+        if t.tzinfo is not None:
+            t = t.astimezone(dt.timezone.utc).replace(tzinfo=None)
+        return np.datetime64(t, "s")
+
+    @property
+    def last_time(self):
+        return self.to_datetime(self.times[-1]) if len(self) else None
+
+    @property
+    def last_value(self):
+        return self.to_float(self.values[-1]) if len(self) else None
+
+    def hours_before_last(self):
+        """Float array: hours between each point and the latest reading."""
+        if not len(self):
+            return np.zeros(0)
+        return (self.times[-1] - self.times).astype(np.float64) / 3600.0
+
+    def since(self, cutoff):
+        """Points at or after `cutoff` (aware datetime or datetime64)."""
+        if isinstance(cutoff, dt.datetime):
+            cutoff = self.to_datetime64(cutoff)
+        return self[int(np.searchsorted(self.times, cutoff, side="left")):]
+
+    def window(self, hours, end=None):
+        """The last `hours` before `end` (default: the latest reading)."""
+        if not len(self):
+            return self
+        end64 = self.times[-1] if end is None else self.to_datetime64(end)
+        return self.since(end64 - np.timedelta64(int(hours * 3600), "s"))
+
+    def append_newer(self, other):
+        """This series plus the points of `other` that are newer than its tail."""
+        other = GaugeSeries.from_points(other)
+        if len(self):
+            other = other[other.times > self.times[-1]]
+        tz = other.tz if len(other) else self.tz
+        return GaugeSeries(
+            np.concatenate([self.times, other.times]),
+            np.concatenate([self.values, other.values]),
+            tz,
+        )
+
+    def fingerprint(self):
+        """Cheap identity for caching: (point count, last time, last value)."""
+        if not len(self):
+            return (0, None, None)
+        return (len(self), int(self.times[-1].astype(np.int64)), float(self.values[-1]))
+
+    def to_payload(self):
+        """JSON-friendly form for the disk cache."""
+        return {
+            "t": self.times.astype(np.int64).tolist(),
+            "v": self.values.astype(float).tolist(),
+            "tz": self.tz.utcoffset(None).total_seconds() if self.tz else 0,
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        tz = dt.timezone(dt.timedelta(seconds=payload.get("tz", 0)))
+        return cls(np.asarray(payload["t"], dtype=np.int64).astype("datetime64[s]"), payload["v"], tz)
+
+
+def _parse_utc_offset(suffix):
+    """
+    Seconds east of UTC from what follows "YYYY-MM-DDTHH:MM:SS" in an ISO
+    stamp: ".000-08:00", "-07:00", "Z", "" (treated as UTC).
+    """
+    for i, ch in enumerate(suffix):
+        if ch in "+-":
+            sign = 1 if ch == "+" else -1
+            hh, _, mm = suffix[i + 1:].partition(":")
+            return sign * (int(hh) * 3600 + int(mm or 0) * 60)
+    return 0
+
+
+USGS_NO_DATA = -999999.0  # the IV service's noDataValue
+
+
+def _to_float_or_nan(x):
+    try:
+        return float(x)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _parse_usgs_values(raw_values, no_data=USGS_NO_DATA):
+    """
+    Reading strings -> float32 array. Odd entries ("Ice", "", None), non-finite
+    values and the no-data sentinel all become NaN, for the caller to drop.
+    """
+    values = np.array(raw_values)
+    try:
+        values = values.astype(np.float32)
+    except (TypeError, ValueError):
+        values = np.array([_to_float_or_nan(x) for x in values], dtype=np.float32)
+    values[~np.isfinite(values) | (values == np.float32(no_data))] = np.nan
+    return values
+
+
+def _parse_points_slow(raw, no_data=USGS_NO_DATA):
+    """Per-point fallback for blocks the bulk parser can't handle."""
+    times, raw_values = [], []
+    for v in raw:
+        try:
+            t = dt.datetime.fromisoformat(v["dateTime"].replace("Z", "+00:00"))
+            value = v["value"]
+        except (KeyError, TypeError, ValueError, AttributeError):
+            continue
+        times.append(t)
+        raw_values.append(value)
+    values = _parse_usgs_values(raw_values, no_data) if raw_values else []
+    return GaugeSeries.from_points((t, x) for t, x in zip(times, values) if not np.isnan(x))
+
+
+def parse_usgs_timeseries(ts):
+    """
+    Turn one USGS timeSeries block into a GaugeSeries.
+
+    Stamps look like "2023-12-28T14:30:00.000-08:00". The local part of every
+    stamp is parsed by NumPy in one go; the UTC offset is parsed once per
+    distinct suffix (a gauge has one or two, across a DST change) and
+    subtracted per point, so mixed offsets still land on the right UTC time.
+    """
+    values_blocks = ts.get("values", [])
+    if not values_blocks:
+        return GaugeSeries()
+    raw = values_blocks[0].get("value", [])
+    if not raw:
+        return GaugeSeries()
+    try:
+        no_data = float((ts.get("variable") or {}).get("noDataValue", USGS_NO_DATA))
+    except (TypeError, ValueError):
+        no_data = USGS_NO_DATA
+
+    try:
+        stamps = [v["dateTime"] for v in raw]
+        local = np.array([s[:19] for s in stamps], dtype="datetime64[s]")
+        suffixes, suffix_idx = np.unique([s[19:] for s in stamps], return_inverse=True)
+        offsets = np.array([_parse_utc_offset(x) for x in suffixes], dtype=np.int64)
+        times = local - offsets[suffix_idx].astype("timedelta64[s]")
+
+        values = _parse_usgs_values([v["value"] for v in raw], no_data)
+    except (KeyError, TypeError, ValueError):
+        return _parse_points_slow(raw, no_data)
+
+    keep = ~np.isnat(times) & ~np.isnan(values)
+    tz = dt.timezone(dt.timedelta(seconds=int(offsets[suffix_idx[-1]])))
+    series = GaugeSeries(times[keep], values[keep], tz)
+    return series.sorted()
+
+
+def fetch_usgs_iv(site_ids, param, hours=None, start=None):
+    """
+    One grouped IV request, either a trailing `hours` period or everything
+    since the aware datetime `start`. Returns {site_id: GaugeSeries} for
+    every requested site (empty if the site had no series), or None if the
+    request failed.
+    """
+    if start is not None:
+        window = f"startDT={quote(start.isoformat(timespec='seconds'))}"
+    else:
+        window = f"period=PT{int(hours)}H"
+    url = (
+        f"{USGS_IV_URL}?format=json&sites={','.join(site_ids)}"
+        f"&parameterCd={param}&{window}"
+    )
+    try:
+        r = http_get(url)
+        if r.status_code != 200:
+            return None
+        ts_list = r.json().get("value", {}).get("timeSeries", [])
+    except Exception:
+        return None
+
+    out = {site_id: GaugeSeries() for site_id in site_ids}
+
+    # One timeSeries per site/parameter (sometimes more for multi-sensor
+    # sites). Keep the first non-empty block per site.
+    for ts in ts_list:
+        try:
+            site_id = ts["sourceInfo"]["siteCode"][0]["value"]
+        except (KeyError, IndexError, TypeError):
+            continue
+        if site_id not in out or out[site_id]:
+            continue
+        out[site_id] = parse_usgs_timeseries(ts)
+
+    return out
+
+
+class GaugeStore:
+    """
+    Thread-safe (site_id, param) -> {"series", "hours", "fetched_at"} map.
+    Keys whose request failed are remembered for one TTL and not re-asked.
+    """
+
+    def __init__(self, ttl=GAUGE_TTL_SECONDS, stale_ttl=GAUGE_STALE_SECONDS, disk=None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.disk = disk
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = set()
+        self._failed = {}  # (site_id, param) -> monotonic time of the failed request
+
+    def _covers(self, entry, hours, now):
+        return (
+            entry is not None
+            and entry["hours"] >= hours
+            and now - entry["fetched_at"] < self.ttl
+        )
+
+    def _servable(self, entry, hours, now):
+        """Stale, but recent enough to serve while a refresh runs."""
+        return (
+            entry is not None
+            and entry["hours"] >= hours
+            and bool(entry["series"])
+            and now - entry["fetched_at"] < self.ttl + self.stale_ttl
+        )
+
+    def _slice(self, entry, hours):
+        return entry["series"].window(hours, end=dt.datetime.now(dt.timezone.utc))
+
+    def _can_extend(self, entry, hours):
+        """A held buffer can be topped up with a startDT delta fetch."""
+        if entry is None or entry["hours"] < hours or not entry["series"]:
+            return False
+        cutoff = dt.datetime.now(dt.timezone.utc) - dt.timedelta(hours=entry["hours"])
+        return entry["series"].last_time >= cutoff
+
+    def _merge(self, entry, new_series, stamp):
+        """Append readings newer than the buffer's tail, trim past retention."""
+        merged = entry["series"].append_newer(new_series)
+        merged = merged.window(entry["hours"], end=dt.datetime.now(dt.timezone.utc))
+        return {"series": merged, "hours": entry["hours"], "fetched_at": stamp}
+
+    # --- disk mirror ---
+
+    def _load_from_disk(self, site_id, param):
+        if self.disk is None:
+            return None
+        value, age = self.disk.get(GAUGE_DISK_NAMESPACE, f"{site_id}:{param}")
+        if value is None:
+            return None
+        try:
+            series = GaugeSeries.from_payload(value["series"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        return {"series": series, "hours": value["hours"], "fetched_at": time.monotonic() - age}
+
+    def _save_to_disk(self, param, entries):
+        if self.disk is None or not entries:
+            return
+        self.disk.put_many(GAUGE_DISK_NAMESPACE, {
+            f"{site_id}:{param}": {
+                "hours": entry["hours"],
+                "series": entry["series"].to_payload(),
+            }
+            for site_id, entry in entries.items()
+        })
+
+    def _held(self, site_ids, param):
+        """Current entries for the sites, falling back to the disk mirror."""
+        with self._lock:
+            held = {s: self._entries.get((s, param)) for s in site_ids}
+
+        for site_id, entry in held.items():
+            if entry is None:
+                entry = self._load_from_disk(site_id, param)
+                if entry is not None:
+                    with self._lock:
+                        entry = self._entries.setdefault((site_id, param), entry)
+                    held[site_id] = entry
+        return held
+
+    # --- upstream refresh ---
+
+    def _refresh(self, site_ids, param, hours, held):
+        """
+        Bring the given sites up to date. Buffers that can be extended get a
+        startDT delta; anything missing or held at a narrower window gets a
+        full grouped fetch. Returns {site_id: new entry} for what succeeded;
+        sites in a failed request are marked so they aren't re-asked for a TTL.
+        """
+        full, delta = [], []
+        fetch_hours = hours
+        for site_id in site_ids:
+            entry = held.get(site_id)
+            if self._can_extend(entry, hours):
+                delta.append(site_id)
+                continue
+            full.append(site_id)
+            if entry is not None:
+                # Keep the widest window anyone has asked for
+                fetch_hours = max(fetch_hours, entry["hours"])
+
+        updated, failed = {}, []
+
+        for i in range(0, len(delta), USGS_BATCH_SIZE):
+            chunk = delta[i:i + USGS_BATCH_SIZE]
+            # One startDT per grouped request: the oldest tail in the group.
+            # Overlap with newer tails is dropped in _merge.
+            start = min(held[s]["series"].last_time for s in chunk)
+            fetched = fetch_usgs_iv(chunk, param, start=start)
+            if fetched is None:
+                failed.extend(chunk)
+                continue
+            stamp = time.monotonic()
+            for site_id, new_series in fetched.items():
+                updated[site_id] = self._merge(held[site_id], new_series, stamp)
+
+        for i in range(0, len(full), USGS_BATCH_SIZE):
+            chunk = full[i:i + USGS_BATCH_SIZE]
+            fetched = fetch_usgs_iv(chunk, param, hours=fetch_hours)
+            if fetched is None:
+                failed.extend(chunk)
+                continue
+            stamp = time.monotonic()
+            for site_id, series in fetched.items():
+                updated[site_id] = {"series": series, "hours": fetch_hours, "fetched_at": stamp}
+
+        stamp = time.monotonic()
+        with self._lock:
+            for site_id, entry in updated.items():
+                self._entries[(site_id, param)] = entry
+                self._failed.pop((site_id, param), None)
+            for site_id in failed:
+                self._failed[(site_id, param)] = stamp
+        self._save_to_disk(param, updated)
+        return updated
+
+    def _refresh_async(self, site_ids, param, hours, held):
+        """Background refresh for stale-but-servable sites (deduped per key)."""
+        with self._lock:
+            todo = [s for s in site_ids if (s, param) not in self._inflight]
+            self._inflight.update((s, param) for s in todo)
+        if not todo:
+            return
+
+        def run():
+            try:
+                self._refresh(todo, param, hours, held)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._inflight.difference_update((s, param) for s in todo)
+
+        threading.Thread(target=run, name="gauge-refresh", daemon=True).start()
+
+    def get_many(self, site_ids, param, hours):
+        """
+        Return {site_id: GaugeSeries of the last `hours`} for the given sites.
+        Fresh buffers are served as-is, slightly stale ones are served while a
+        background refresh runs, and the rest are refreshed before returning.
+        Sites whose request failed keep serving what they had, or are left out,
+        and aren't asked again until a TTL after the failure.
+        """
+        now = time.monotonic()
+        held = self._held(site_ids, param)
+        with self._lock:
+            failed_at = {s: self._failed.get((s, param)) for s in site_ids}
+
+        sync, background = [], []
+        for site_id, entry in held.items():
+            if self._covers(entry, hours, now):
+                continue
+            if failed_at[site_id] is not None and now - failed_at[site_id] < self.ttl:
+                continue
+            if self._servable(entry, hours, now):
+                background.append(site_id)
+            else:
+                sync.append(site_id)
+
+        if sync:
+            held.update(self._refresh(sync, param, hours, held))
+        if background:
+            self._refresh_async(background, param, hours, dict(held))
+
+        out = {}
+        for site_id, entry in held.items():
+            if entry is not None and entry["hours"] >= hours:
+                out[site_id] = self._slice(entry, hours)
+        return out
+
+    def get(self, site_id, param, hours):
+        """Single-site convenience wrapper around get_many. Empty on failure."""
+        return self.get_many([site_id], param, hours).get(site_id, GaugeSeries())
+
+
+@st.cache_resource
+def get_gauge_store():
+    """The one GaugeStore shared by every page and session in this process."""
+    return GaugeStore(disk=get_disk_cache())
+
+
+def get_gauge_series(site_id, param, hours):
+    """GaugeSeries for one gauge over the last `hours`."""
+    return get_gauge_store().get(site_id, param, hours)
+
+
+def get_gauge_series_many(site_ids, param, hours):
+    """Batch form of get_gauge_series; failed sites are absent from the result."""
+    return get_gauge_store().get_many(list(site_ids), param, hours)
@@ -0,0 +1,98 @@
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# ============================================================
+# SHARED HTTP CLIENT
+# ============================================================
+# Every upstream call (USGS, NWRFC, NWS) goes through one process-wide
+# requests.Session, so repeated calls to the same host reuse warm keep-alive
+# connections instead of paying a fresh TCP + TLS handshake each time.
+# Headers, gzip negotiation, timeouts and per-host concurrency caps are set
+# here once rather than at every call site.
+
+# Browser-style User-Agent (USGS answers 403 to some bare clients)
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+    "Accept": "application/json, application/geo+json;q=0.9, */*;q=0.8",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+# api.weather.gov asks every client to identify itself with an app name and
+# contact, e.g. "(myapp.com, me@example.com)"; set STEELHEAD_CONTACT to add one
+_NWS_CONTACT = os.environ.get("STEELHEAD_CONTACT", "").strip()
+NWS_USER_AGENT = f"(steelhead-navigator, {_NWS_CONTACT})" if _NWS_CONTACT else "(steelhead-navigator)"
+
+# Per-host headers layered over DEFAULT_HEADERS
+HOST_HEADERS = {
+    "api.weather.gov": {"User-Agent": NWS_USER_AGENT},
+}
+
+# Seconds; hosts not listed get DEFAULT_TIMEOUT
+HOST_TIMEOUTS = {
+    "waterservices.usgs.gov": 10,
+    "www.nwrfc.noaa.gov": 6,
+    "api.weather.gov": 6,
+}
+DEFAULT_TIMEOUT = 10
+
+# Simultaneous in-flight requests per host (be polite to USGS/NWS)
+HOST_LIMITS = {
+    "waterservices.usgs.gov": 4,
+    "www.nwrfc.noaa.gov": 2,
+    "api.weather.gov": 4,
+}
+DEFAULT_HOST_LIMIT = 2
+
+POOL_CONNECTIONS = 8   # hosts with a cached pool
+POOL_MAXSIZE = 8       # kept-alive connections per host
+
+_SESSION = None
+_SESSION_LOCK = threading.Lock()
+_HOST_SEMAPHORES = {}
+
+
+def get_session():
+    """The process-wide pooled Session (created on first use)."""
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _SESSION = session
+        return _SESSION
+
+
+@contextmanager
+def host_slot(url):
+    """Hold one of the per-host request slots for the duration of a call."""
+    host = urlparse(url).netloc
+    with _SESSION_LOCK:
+        sem = _HOST_SEMAPHORES.get(host)
+        if sem is None:
+            sem = threading.BoundedSemaphore(HOST_LIMITS.get(host, DEFAULT_HOST_LIMIT))
+            _HOST_SEMAPHORES[host] = sem
+    with sem:
+        yield
+
+
+def http_get(url, params=None, headers=None, timeout=None):
+    """
+    GET through the shared session with the host's slot, timeout and the
+    common headers. Returns the requests.Response; network errors propagate.
+    """
+    host = urlparse(url).netloc
+    if timeout is None:
+        timeout = HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT)
+    if host in HOST_HEADERS:
+        headers = {**HOST_HEADERS[host], **(headers or {})}
+    with host_slot(url):
+        return get_session().get(url, params=params, headers=headers, timeout=timeout)
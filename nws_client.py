@@ -0,0 +1,358 @@
+import datetime as dt
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from disk_cache import get_disk_cache
+from http_client import http_get
+
+# ============================================================
+# NWS GRIDPOINT FORECASTS
+# ============================================================
+# api.weather.gov forecasts are issued per gridpoint (office, x, y), and
+# many rivers share one. Forecasts are cached by gridpoint, not by river,
+# so each gridpoint is fetched once per TTL however many rivers use it.
+#
+# Gridded forecast data is regenerated roughly once an hour, so that is the
+# TTL; older copies are still served for a while as a refresh runs.
+#
+# Which gridpoint a lat/lon falls in (/points) practically never changes,
+# so that lookup is cached permanently, in memory and on disk. A forecast
+# refresh is then a single request, and nearby coordinates that land in
+# the same grid cell share one cached forecast.
+
+NWS_API_URL = "https://api.weather.gov"
+
+NWS_POINTS_NAMESPACE = "nws_points"
+
+NWS_FORECAST_NAMESPACE = "nws_forecast_grid"
+NWS_FORECAST_TTL_SECONDS = 3600        # text forecasts update a few times a day
+NWS_FORECAST_STALE_SECONDS = 6 * 3600  # served from disk while a refresh runs
+
+NWS_PRECIP_NAMESPACE = "nws_precip_grid"
+NWS_PRECIP_TTL_SECONDS = 3600          # NWS grids are regenerated about hourly
+NWS_PRECIP_STALE_SECONDS = 3 * 3600    # served while a refresh runs
+
+NWS_SEED_WORKERS = 4  # matches the api.weather.gov slot count in http_client
+
+NWS_FAILURE_SECONDS = 600  # a failed lookup isn't retried for this long
+
+
+def gridpoint_key(office, gx, gy):
+    return f"{office}/{gx},{gy}"
+
+
+def point_key(lat, lon):
+    return f"{round(lat, 4)},{round(lon, 4)}"
+
+
+# ============================================================
+# FAILED-REQUEST MARKERS
+# ============================================================
+# A request that failed is remembered per (namespace, key) for a short
+# while, so pages that rerun often don't send the same doomed request (and
+# wait out its timeout) on every rerun. Old copies on disk are still served.
+
+_FAILURES = {}
+_FAILURES_LOCK = threading.Lock()
+
+
+def recently_failed(namespace, key):
+    with _FAILURES_LOCK:
+        failed_at = _FAILURES.get((namespace, key))
+    return failed_at is not None and time.monotonic() - failed_at < NWS_FAILURE_SECONDS
+
+
+def note_result(namespace, key, ok):
+    """Record whether the latest request for a key succeeded."""
+    with _FAILURES_LOCK:
+        if ok:
+            _FAILURES.pop((namespace, key), None)
+        else:
+            _FAILURES[(namespace, key)] = time.monotonic()
+
+
+def guarded_loader(namespace, key, fetch):
+    """
+    Loader for DiskCache.read_through: calls `fetch` and records the outcome,
+    or returns None without a request while the key is marked failed.
+    """
+    if recently_failed(namespace, key):
+        return lambda: None
+
+    def load():
+        value = fetch()
+        note_result(namespace, key, value is not None)
+        return value
+    return load
+
+
+# ============================================================
+# POINTS -> GRIDPOINT RESOLUTION
+# ============================================================
+
+_GRIDPOINTS = {}
+_GRIDPOINTS_LOCK = threading.Lock()
+
+
+def fetch_gridpoint(lat, lon):
+    """One /points request: (office, x, y) for a lat/lon, or None on failure."""
+    try:
+        r = http_get(f"{NWS_API_URL}/points/{point_key(lat, lon)}")
+        if r.status_code != 200:
+            return None
+        props = r.json()["properties"]
+        return props["gridId"], int(props["gridX"]), int(props["gridY"])
+    except Exception:
+        return None
+
+
+def resolve_gridpoint(lat, lon):
+    """
+    (office, x, y) of the NWS grid cell holding a lat/lon. Answers come from
+    memory, then the disk cache, and only then from /points; resolved cells
+    are kept for good. None if the point can't be resolved right now (a
+    failed /points lookup isn't retried for NWS_FAILURE_SECONDS).
+    """
+    key = point_key(lat, lon)
+    with _GRIDPOINTS_LOCK:
+        gridpoint = _GRIDPOINTS.get(key)
+    if gridpoint is not None:
+        return gridpoint
+
+    disk = get_disk_cache()
+    value, _ = disk.get(NWS_POINTS_NAMESPACE, key)
+    try:
+        gridpoint = (value["office"], int(value["x"]), int(value["y"]))
+    except (KeyError, TypeError, ValueError):
+        if recently_failed(NWS_POINTS_NAMESPACE, key):
+            return None
+        gridpoint = fetch_gridpoint(lat, lon)
+        note_result(NWS_POINTS_NAMESPACE, key, gridpoint is not None)
+        if gridpoint is None:
+            return None
+        office, gx, gy = gridpoint
+        disk.put(NWS_POINTS_NAMESPACE, key, {"office": office, "x": gx, "y": gy})
+
+    with _GRIDPOINTS_LOCK:
+        _GRIDPOINTS[key] = gridpoint
+    return gridpoint
+
+
+def seed_gridpoints(coords):
+    """
+    Resolve a list of (lat, lon) on a background thread so later forecast
+    loads skip /points. Returns the thread; already-known points cost nothing.
+    """
+    coords = list(dict.fromkeys((float(lat), float(lon)) for lat, lon in coords))
+
+    def run():
+        with ThreadPoolExecutor(max_workers=NWS_SEED_WORKERS) as pool:
+            list(pool.map(lambda c: resolve_gridpoint(*c), coords))
+
+    thread = threading.Thread(target=run, name="nws-seed-gridpoints", daemon=True)
+    thread.start()
+    return thread
+
+
+# ============================================================
+# FORECASTS (CACHED PER GRIDPOINT)
+# ============================================================
+
+def fetch_forecast(office, gx, gy):
+    """The gridpoint's 12-hour text forecast periods, or None on failure."""
+    try:
+        r = http_get(f"{NWS_API_URL}/gridpoints/{gridpoint_key(office, gx, gy)}/forecast")
+        if r.status_code != 200:
+            return None
+        return r.json()["properties"]["periods"] or None
+    except Exception:
+        return None
+
+
+def get_forecast(office, gx, gy):
+    """Text forecast periods for a gridpoint, read through the disk cache."""
+    key = gridpoint_key(office, gx, gy)
+    return get_disk_cache().read_through(
+        NWS_FORECAST_NAMESPACE,
+        key,
+        guarded_loader(NWS_FORECAST_NAMESPACE, key, lambda: fetch_forecast(office, gx, gy)),
+        ttl=NWS_FORECAST_TTL_SECONDS,
+        stale_ttl=NWS_FORECAST_STALE_SECONDS,
+    )
+
+
+def get_forecast_for_point(lat, lon):
+    """Text forecast periods for a lat/lon via its cached gridpoint."""
+    gridpoint = resolve_gridpoint(lat, lon)
+    if gridpoint is None:
+        return None
+    return get_forecast(*gridpoint)
+
+
+# ============================================================
+# NUMERIC PRECIP GRIDS (QPF + POP)
+# ============================================================
+# The raw gridpoint endpoint carries quantitativePrecipitation (mm) and
+# probabilityOfPrecipitation (%) as time series of "start/duration" blocks.
+# They are flattened once per gridpoint into hourly arrays, so the apps get
+# rain totals and chances for any window with a slice and a sum/max rather
+# than by reading the forecast prose.
+
+_MM_PER_INCH = 25.4
+_DURATION_RE = re.compile(r"P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?)?$")
+
+
+def _parse_valid_time(valid_time):
+    """'2026-10-18T06:00:00+00:00/PT6H' -> (start epoch seconds, hours)."""
+    start, _, duration = valid_time.partition("/")
+    m = _DURATION_RE.match(duration)
+    if not m:
+        raise ValueError(f"bad duration: {duration!r}")
+    days, hours, minutes = (int(x) if x else 0 for x in m.groups())
+    span = days * 24 + hours + (1 if minutes else 0)
+    return int(dt.datetime.fromisoformat(start).timestamp()), max(span, 1)
+
+
+class PrecipGrid:
+    """
+    Hourly precip arrays for one gridpoint: `qpf` (inches in that hour) and
+    `pop` (% chance), hour i starting at `start` + i hours (epoch seconds).
+    """
+
+    __slots__ = ("start", "qpf", "pop")
+
+    def __init__(self, start=0, qpf=(), pop=()):
+        self.start = int(start)
+        self.qpf = np.asarray(qpf, dtype=np.float32)
+        self.pop = np.asarray(pop, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.qpf)
+
+    def __bool__(self):
+        return len(self.qpf) > 0
+
+    @classmethod
+    def from_layers(cls, qpf_values, pop_values):
+        """Build from the raw endpoint's QPF (mm) and PoP value lists."""
+        blocks = []
+        for layer, name in ((qpf_values, "qpf"), (pop_values, "pop")):
+            for item in layer or []:
+                try:
+                    t0, hours = _parse_valid_time(item["validTime"])
+                except (KeyError, TypeError, ValueError):
+                    continue
+                blocks.append((name, t0, hours, item.get("value")))
+        if not blocks:
+            return cls()
+
+        start = min(t0 for _, t0, _, _ in blocks) // 3600 * 3600
+        end = max(t0 + hours * 3600 for _, t0, hours, _ in blocks)
+        n = -(-(end - start) // 3600)
+        qpf = np.zeros(n, dtype=np.float32)
+        pop = np.zeros(n, dtype=np.float32)
+        for name, t0, hours, value in blocks:
+            if value is None:
+                continue
+            i = (t0 - start) // 3600
+            if name == "qpf":
+                # Spread the block's total evenly over its hours
+                qpf[i:i + hours] = value / _MM_PER_INCH / hours
+            else:
+                pop[i:i + hours] = value
+        return cls(start, qpf, pop)
+
+    def hour_index(self, when):
+        """Index of the hour holding an aware datetime (negative before `start`)."""
+        return int((when.timestamp() - self.start) // 3600)
+
+    def _span(self, start, end):
+        """Array slice for the hours overlapping [start, end) (aware datetimes)."""
+        i0 = self.hour_index(start)
+        i1 = -int((self.start - end.timestamp()) // 3600)
+        return slice(max(i0, 0), max(min(i1, len(self.qpf)), 0))
+
+    def qpf_total(self, start, end):
+        """Forecast rain (inches) between two aware datetimes."""
+        return float(self.qpf[self._span(start, end)].sum())
+
+    def pop_max(self, start, end):
+        """Highest chance of precip (%) between two aware datetimes."""
+        window = self.pop[self._span(start, end)]
+        return float(window.max()) if len(window) else 0.0
+
+    def to_payload(self):
+        return {
+            "start": self.start,
+            "qpf": [round(float(x), 4) for x in self.qpf],
+            "pop": [float(x) for x in self.pop],
+        }
+
+    @classmethod
+    def from_payload(cls, payload):
+        return cls(payload["start"], payload["qpf"], payload["pop"])
+
+
+def fetch_precip_grid(office, gx, gy):
+    """One raw gridpoint request reduced to a PrecipGrid payload, or None."""
+    try:
+        r = http_get(f"{NWS_API_URL}/gridpoints/{gridpoint_key(office, gx, gy)}")
+        if r.status_code != 200:
+            return None
+        props = r.json()["properties"]
+    except Exception:
+        return None
+    grid = PrecipGrid.from_layers(
+        (props.get("quantitativePrecipitation") or {}).get("values"),
+        (props.get("probabilityOfPrecipitation") or {}).get("values"),
+    )
+    return grid.to_payload() if grid else None
+
+
+_PRECIP_GRIDS = {}
+_PRECIP_GRIDS_LOCK = threading.Lock()
+
+
+def get_precip_grid(office, gx, gy):
+    """
+    PrecipGrid for a gridpoint. Decoded arrays are kept in memory until the
+    disk copy they came from is a TTL old; stale copies served while a
+    refresh runs are not held. A failed fetch isn't retried for
+    NWS_FAILURE_SECONDS. None if nothing is available.
+    """
+    key = gridpoint_key(office, gx, gy)
+    now = time.monotonic()
+    with _PRECIP_GRIDS_LOCK:
+        held = _PRECIP_GRIDS.get(key)
+    if held is not None and now - held[0] < NWS_PRECIP_TTL_SECONDS:
+        return held[1]
+
+    payload, age = get_disk_cache().read_through_with_age(
+        NWS_PRECIP_NAMESPACE,
+        key,
+        guarded_loader(NWS_PRECIP_NAMESPACE, key, lambda: fetch_precip_grid(office, gx, gy)),
+        ttl=NWS_PRECIP_TTL_SECONDS,
+        stale_ttl=NWS_PRECIP_STALE_SECONDS,
+    )
+    try:
+        grid = PrecipGrid.from_payload(payload)
+    except (KeyError, TypeError, ValueError):
+        return held[1] if held is not None else None
+
+    if age < NWS_PRECIP_TTL_SECONDS:
+        # Held as of the disk row's fetch time, so it expires with that row
+        with _PRECIP_GRIDS_LOCK:
+            _PRECIP_GRIDS[key] = (now - age, grid)
+    return grid
+
+
+def get_precip_grid_for_point(lat, lon):
+    """PrecipGrid for a lat/lon via its cached gridpoint."""
+    gridpoint = resolve_gridpoint(lat, lon)
+    if gridpoint is None:
+        return None
+    return get_precip_grid(*gridpoint)
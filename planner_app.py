@@ -1,11 +1,14 @@
 import streamlit as st
 import pandas as pd
 import datetime
-import requests
 from datetime import timedelta
 import re
 import math
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+from gauge_store import get_gauge_series
+from nws_client import get_forecast_for_point, get_precip_grid_for_point, seed_gridpoints
 
 # --- LOAD ROUTES FOR OFFLINE MAP ROUTING ---
 # If routes.json is missing, use an empty dict so the dashboard still works.
@@ -310,32 +313,11 @@ REGION_RIVER_ORDER = {
 
 # ===== 2. LIVE INTEL & SCORING =====
 
-@st.cache_data(ttl=600)
 def get_usgs_series(site_id, param_code='00060', hours=8):
-    """Fetch recent USGS flow data for the last N hours."""
+    """Fetch recent USGS flow data for the last N hours (shared gauge store)."""
     try:
-        url = (
-            "https://waterservices.usgs.gov/nwis/iv/"
-            f"?format=json&sites={site_id}&parameterCd={param_code}&period=PT{hours}H"
-        )
-        r = requests.get(url, timeout=6).json()
-        ts_list = r.get('value', {}).get('timeSeries', [])
-        if not ts_list:
-            return []
-        ts = ts_list[0]
-        vals = ts.get('values', [])[0].get('value', [])
-        out = []
-        for v in vals:
-            try:
-                dt = datetime.datetime.fromisoformat(
-                    v['dateTime'].replace("Z", "+00:00")
-                )
-                val = float(v['value'])
-                if val >= 0:
-                    out.append((dt, val))
-            except:
-                continue
-        return out
+        series = get_gauge_series(site_id, param_code, hours)
+        return series[series.values >= 0]
     except:
         return []
 
@@ -351,23 +333,90 @@ def get_oil_price():
     return 70.0
 
 
-@st.cache_data(ttl=3600)
+# Points shown in the "Weather Forecast" expander
+WEATHER_LOCATIONS = [
+    ("Pyramid", 40.01, -119.62),
+    ("Eureka", 40.80, -124.16),
+    ("Crescent City", 41.75, -124.20),
+    ("Brookings", 42.05, -124.27),
+    ("Coos Bay", 43.36, -124.21),
+    ("Forks", 47.95, -124.38)
+]
+
+# Forecast points used by estimate_precip_for_river
+PRECIP_POINTS = {
+    "eel": (40.80, -124.16),
+    "smith": (41.75, -124.20),
+    "chetco": (42.05, -124.27),
+    "umpqua": (43.36, -124.21),
+    "olympic": (47.95, -124.38),
+}
+
+# Resolve every known point to its NWS gridpoint up front (in the
+# background), so forecast loads go straight to the gridpoint.
+seed_gridpoints(
+    [(la, lo) for _, la, lo in WEATHER_LOCATIONS] + list(PRECIP_POINTS.values())
+)
+
+
 def get_nws_forecast_data(lat, lon):
-    """Fetch NOAA weather forecast periods."""
+    """
+    NOAA weather forecast periods via the point's cached gridpoint; points in
+    the same grid cell share one cached forecast.
+    """
+    return get_forecast_for_point(lat, lon)
+
+
+def get_nws_weather_many(coords):
+    """
+    (forecast periods, PrecipGrid) for several (lat, lon) points at once, in
+    input order. Every lookup runs on its own thread, so the batch takes
+    about as long as the slowest point.
+    """
+    coords = list(coords)
+    if not coords:
+        return []
+    with ThreadPoolExecutor(max_workers=2 * len(coords)) as pool:
+        periods = pool.map(lambda c: get_nws_forecast_data(*c), coords)
+        grids = pool.map(lambda c: get_precip_grid_for_point(*c), coords)
+        return list(zip(periods, grids))
+
+
+PRECIP_WINDOW_HOURS = 12  # one forecast period ahead
+
+
+def precip_bonus(qpf_in, pop_pct):
+    """Score bonus from forecast rain (inches) and chance of precip (%)."""
+    if qpf_in >= 0.75:
+        return -1.0
+    if qpf_in >= 0.5:
+        return -0.75
+    if qpf_in > 0.25:
+        return -0.25
+    if qpf_in < 0.01 and pop_pct < 20:
+        return 0.5   # dry
+    return 0.0
+
+
+def format_precip_amount(qpf_in, pop_pct):
+    """Display string for a forecast rain total (inches) and chance (%)."""
+    if qpf_in < 0.01:
+        if pop_pct >= 30:
+            return f"💧 Precip: trace ({pop_pct:.0f}%)"
+        return "💧 Precip: none or minimal"
+    return f'💧 Precip: {qpf_in:.2f}" ({pop_pct:.0f}%)'
+
+
+def period_precip_text(grid, period):
+    """format_precip_amount over a forecast period's window, or None if unknown."""
+    if not grid:
+        return None
     try:
-        h = {"User-Agent": "(steelhead-navigator)"}
-        r = requests.get(
-            f"https://api.weather.gov/points/{round(lat, 4)},{round(lon, 4)}",
-            headers=h,
-            timeout=6
-        ).json()
-        return requests.get(
-            r['properties']['forecast'],
-            headers=h,
-            timeout=6
-        ).json()['properties']['periods']
-    except:
+        start = datetime.datetime.fromisoformat(period["startTime"])
+        end = datetime.datetime.fromisoformat(period["endTime"])
+    except (KeyError, TypeError, ValueError):
         return None
+    return format_precip_amount(grid.qpf_total(start, end), grid.pop_max(start, end))
 
 
 def parse_target_range(target_str):
@@ -440,40 +489,27 @@ def compute_trend_bonus(series, last_val=None, t_low=None):
 
 
 def estimate_precip_for_river(river_name):
-    """Estimate precipitation impact based on NOAA text."""
+    """Estimate precipitation impact from the NWS rain forecast (QPF/PoP)."""
     if "Eel" in river_name or "Van Duzen" in river_name:
-        lat, lon = 40.80, -124.16
+        lat, lon = PRECIP_POINTS["eel"]
     elif "Smith" in river_name:
-        lat, lon = 41.75, -124.20
+        lat, lon = PRECIP_POINTS["smith"]
     elif river_name in ["Chetco", "Elk River", "Sixes River", "Rogue"]:
-        lat, lon = 42.05, -124.27
+        lat, lon = PRECIP_POINTS["chetco"]
     elif river_name in ["N. Umpqua", "Umpqua (Main)"]:
-        lat, lon = 43.36, -124.21
+        lat, lon = PRECIP_POINTS["umpqua"]
     elif river_name in ["Bogachiel", "Calawah", "Hoh", "Queets"]:
-        lat, lon = 47.95, -124.38
+        lat, lon = PRECIP_POINTS["olympic"]
     else:
         return 0.0
 
-    periods = get_nws_forecast_data(lat, lon)
-    if not periods:
+    grid = get_precip_grid_for_point(lat, lon)
+    if not grid:
         return 0.0
 
-    txt = periods[0]["detailedForecast"].lower()
-
-    if "heavy rain" in txt or "1 inch" in txt or "one inch" in txt:
-        return -1.0
-    if "between half and three quarters" in txt:
-        return -0.75
-    if "between a quarter and half" in txt:
-        return -0.25
-    if "a quarter of an inch" in txt:
-        return 0.0
-    if "light rain" in txt or "showers" in txt:
-        return 0.0
-    if "dry" in txt or "mostly clear" in txt:
-        return 0.5
-
-    return 0.0
+    now = datetime.datetime.now(datetime.timezone.utc)
+    end = now + timedelta(hours=PRECIP_WINDOW_HOURS)
+    return precip_bonus(grid.qpf_total(now, end), grid.pop_max(now, end))
 
 
 def river_type_bonus(river_name, index):
@@ -535,17 +571,17 @@ def auto_score_river(river_name, spec):
 
     flow_idx = compute_flow_index(last_val, low_limit, t_low, t_high)
     trend_bonus = compute_trend_bonus(series, last_val=last_val, t_low=t_low)
-    precip_bonus = estimate_precip_for_river(river_name)
+    weather_bonus = estimate_precip_for_river(river_name)
     type_bonus = river_type_bonus(river_name, flow_idx)
 
-    raw_score = 5.0 * flow_idx + trend_bonus + precip_bonus + type_bonus
+    raw_score = 5.0 * flow_idx + trend_bonus + weather_bonus + type_bonus
     total = max(0.0, min(raw_score, 5.0))
 
     return {
         "total": total,
         "flow": flow_idx * 5.0,
         "trend": trend_bonus,
-        "weather": precip_bonus,
+        "weather": weather_bonus,
         "base": type_bonus
     }
 
@@ -1861,6 +1897,7 @@ def render_planner():
         st.divider()
         st.subheader("Conditions")
 
+        # Prose fallback for when a location's numeric precip grid is unavailable
         def format_precip_text(txt: str) -> str:
             lower = txt.lower()
             if "between a tenth and a quarter of an inch" in lower or "between one tenth and one quarter of an inch" in lower:
@@ -1903,38 +1940,31 @@ def render_planner():
             if st.button("🔄 Load Weather"):
                 with st.spinner("Fetching..."):
                     t1, t2 = st.tabs(["36-Hour Detail", "5-Day Outlook"])
-                    locs = [
-                        ("Pyramid", 40.01, -119.62),
-                        ("Eureka", 40.80, -124.16),
-                        ("Crescent City", 41.75, -124.20),
-                        ("Brookings", 42.05, -124.27),
-                        ("Coos Bay", 43.36, -124.21),
-                        ("Forks", 47.95, -124.38)
-                    ]
+                    locs = WEATHER_LOCATIONS
+                    # All locations load concurrently; both tabs use the result
+                    weather = get_nws_weather_many((la, lo) for _, la, lo in locs)
                     with t1:
                         cols = st.columns(3)
-                        for i, (n, la, lo) in enumerate(locs):
-                            p = get_nws_forecast_data(la, lo)
+                        for i, ((n, la, lo), (p, grid)) in enumerate(zip(locs, weather)):
                             with cols[i % 3]:
                                 st.markdown(f"**{n}**")
                                 if p:
                                     for x in p[:3]:
-                                        txt = x["detailedForecast"]
-                                        precip_clean = format_precip_text(txt)
+                                        precip_clean = (period_precip_text(grid, x)
+                                                        or format_precip_text(x["detailedForecast"]))
                                         st.caption(
                                             f"**{x['name']}**: {x['temperature']}°F. {x['shortForecast']}\n"
                                             f"*Wind: {x.get('windSpeed')} | {precip_clean}*"
                                         )
                     with t2:
                         cols = st.columns(3)
-                        for i, (n, la, lo) in enumerate(locs):
-                            p = get_nws_forecast_data(la, lo)
+                        for i, ((n, la, lo), (p, grid)) in enumerate(zip(locs, weather)):
                             with cols[i % 3]:
                                 st.markdown(f"**{n}**")
                                 if p:
                                     for x in p[:10:2]:
-                                        txt = x["detailedForecast"]
-                                        precip_clean = format_precip_text(txt)
+                                        precip_clean = (period_precip_text(grid, x)
+                                                        or format_precip_text(x["detailedForecast"]))
                                         st.caption(
                                             f"**{x['name']}**: {x['temperature']}°F. {x['shortForecast']} {precip_clean}"
                                         )
@@ -0,0 +1,10 @@
+import streamlit as st
+
+# Handle Streamlit version compatibility for fragments
+if hasattr(st, "fragment"):
+    fragment = st.fragment
+elif hasattr(st, "experimental_fragment"):
+    fragment = st.experimental_fragment
+else:
+    def fragment(func):
+        return func